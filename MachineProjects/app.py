@@ -1,9 +1,17 @@
+import time
+
 import requests
+from requests.adapters import HTTPAdapter
 import streamlit as st
 
 # config files
 API_BASE = "http://127.0.0.1:8000"
 TMDB_IMG = "https://image.tmdb.org/t/p/w500"
+# keep-alive connections to the API, shared by every session and rerun
+API_POOL_SIZE = 8
+API_TIMEOUT = 25
+
+RENDER_START = time.perf_counter()
 
 st.set_page_config(
     page_title="Movie Recommendation",
@@ -31,6 +39,9 @@ if "view" not in st.session_state:
 if "selected_tmdb_id" not in st.session_state:
     st.session_state.selected_tmdb_id = None
 
+# per-render API call timings for the debug panel
+st.session_state.api_timings = []
+
 qp_view = st.query_params.get("view")
 qp_id = st.query_params.get("id")
 
@@ -61,10 +72,21 @@ def goto_details(tmdb_id: int):
 
 
 # api helper functions
+@st.cache_resource
+def api_session() -> requests.Session:
+    # one pooled session for the whole server process instead of a new
+    # connection per requests.get
+    session = requests.Session()
+    adapter = HTTPAdapter(pool_connections=1, pool_maxsize=API_POOL_SIZE)
+    session.mount("http://", adapter)
+    session.mount("https://", adapter)
+    return session
+
+
 @st.cache_data(ttl=300)
-def api_get_json(path: str, params: dict | None = None):
+def _api_get_json_cached(path: str, params: dict | None = None):
     try:
-        r = requests.get(f"{API_BASE}{path}", params=params, timeout=25)
+        r = api_session().get(f"{API_BASE}{path}", params=params, timeout=API_TIMEOUT)
         if r.status_code >= 400:
             return None, f"{r.status_code}:{r.text[:300]}"
         return r.json(), None
@@ -72,6 +94,39 @@ def api_get_json(path: str, params: dict | None = None):
         return None, f"Request failed: {e}"
 
 
+@st.cache_data(ttl=300)
+def _api_get_page_cached(path: str, params: dict | None = None):
+    # like _api_get_json_cached, plus the X-Next-Cursor header of paged endpoints
+    try:
+        r = api_session().get(f"{API_BASE}{path}", params=params, timeout=API_TIMEOUT)
+        if r.status_code >= 400:
+            return None, f"{r.status_code}:{r.text[:300]}", None
+        return r.json(), None, r.headers.get("X-Next-Cursor")
+    except Exception as e:
+        return None, f"Request failed: {e}", None
+
+
+def _record_timing(path: str, elapsed: float, err):
+    st.session_state.api_timings.append(
+        {"call": path, "ms": round(elapsed * 1000, 1), "ok": err is None}
+    )
+
+
+def api_get_json(path: str, params: dict | None = None):
+    start = time.perf_counter()
+    data, err = _api_get_json_cached(path, params)
+    _record_timing(path, time.perf_counter() - start, err)
+    return data, err
+
+
+def api_get_page(path: str, params: dict | None = None):
+    # -> (data, err, next_cursor)
+    start = time.perf_counter()
+    data, err, cursor = _api_get_page_cached(path, params)
+    _record_timing(path, time.perf_counter() - start, err)
+    return data, err, cursor
+
+
 def poster_grid(cards, cols=6, key_prefix="grid"):
     if not cards:
         st.info("NO movies to Show")
@@ -109,6 +164,61 @@ def poster_grid(cards, cols=6, key_prefix="grid"):
                 )
 
 
+# st.fragment (Streamlit >= 1.37) reruns only the feed when "Load more" is clicked
+_fragment = getattr(st, "fragment", None) or (lambda f: f)
+
+HOME_PAGE_LIMIT = 24
+# loaded feed is dropped and refetched after this long, like the 300 s API cache
+HOME_FEED_TTL = 300
+
+
+def _load_more_home(category: str):
+    feed = st.session_state.home_feed
+    more, err, cursor = api_get_page(
+        "/home", params={"category": category, "limit": HOME_PAGE_LIMIT, "cursor": feed["cursor"]}
+    )
+    if err or more is None:
+        feed["error"] = err
+        return
+
+    # pages may overlap at the edges while TMDB lists shift
+    for card in more:
+        if card.get("tmdb_id") not in feed["seen"]:
+            feed["seen"].add(card.get("tmdb_id"))
+            feed["cards"].append(card)
+    feed["cursor"] = cursor
+    feed["error"] = None
+
+
+@_fragment
+def home_feed_grid(category: str, cols: int):
+    feed = st.session_state.get("home_feed")
+    stale = feed and time.monotonic() - feed["loaded_at"] > HOME_FEED_TTL
+    if not feed or feed["category"] != category or stale:
+        cards, err, cursor = api_get_page(
+            "/home", params={"category": category, "limit": HOME_PAGE_LIMIT}
+        )
+        if err or not cards:
+            st.error(f"Home feed failed: {err or 'Unknown error'}")
+            return
+        feed = {
+            "category": category,
+            "cards": list(cards),
+            "seen": {c.get("tmdb_id") for c in cards},
+            "cursor": cursor,
+            "error": None,
+            "loaded_at": time.monotonic(),
+        }
+        st.session_state.home_feed = feed
+
+    poster_grid(feed["cards"], cols=cols, key_prefix="home_feed")
+
+    if feed["error"]:
+        st.warning(f"Could not load more: {feed['error']}")
+    if feed["cursor"]:
+        st.button("Load more", key="home_load_more", on_click=_load_more_home, args=(category,))
+
+
 def to_cards_From_Tfidf_items(tfidf_items):
     cards = []
     for X in tfidf_items or []:
@@ -151,7 +261,11 @@ def parse_tmdb_search_to_cards(data, keyword: str, limit: int = 25):
     else:
         raw_items = []
 
-    matches = [x for x in raw_items if keyword_l in x["title"].lower()][:limit]
+    # /autocomplete cards are already matched and ranked by the API
+    if isinstance(data, list):
+        matches = raw_items[:limit]
+    else:
+        matches = [x for x in raw_items if keyword_l in x["title"].lower()][:limit]
     final_list = matches if matches else raw_items[:limit]
 
     suggestions = []
@@ -190,6 +304,9 @@ with st.sidebar:
 
     grid_cols = st.slider("Grid Columns", 4, 8, 6)
 
+    st.markdown("---")
+    show_timings = st.checkbox("Show API timings (debug)", value=False)
+
 
 # header
 st.title("🎬 Movie Explorer")
@@ -209,12 +326,14 @@ if st.session_state.view == "home":
         if len(typed.strip()) < 2:
             st.caption("Please enter at least 2 characters to search.")
         else:
-            data, err = api_get_json("/tmdb/search", params={"query": typed.strip()})
+            data, err = api_get_json(
+                "/autocomplete", params={"query": typed.strip(), "limit": 20}
+            )
             if err or data is None:
                 st.error(f"Failed to fetch movies: {err}")
             else:
                 suggestions, cards = parse_tmdb_search_to_cards(
-                    data, typed.strip(), limit=24
+                    data, typed.strip(), limit=20
                 )
 
                 if suggestions:
@@ -233,14 +352,7 @@ if st.session_state.view == "home":
     else:
         st.markdown(f"### 🏠 Home — {home_category.replace('_', ' ').title()}")
 
-        home_cards, err = api_get_json(
-            "/home", params={"category": home_category, "limit": 24}
-        )
-
-        if err or not home_cards:
-            st.error(f"Home feed failed: {err or 'Unknown error'}")
-        else:
-            poster_grid(home_cards, cols=grid_cols, key_prefix="home_feed")
+        home_feed_grid(home_category, grid_cols)
 
 # DETAILS VIEW
 if st.session_state.view == "details":
@@ -258,11 +370,16 @@ if st.session_state.view == "details":
         if st.button("← Back to Home"):
             goto_home()
 
-    data, err = api_get_json(f"/movie/id/{tmdb_id}")
-    if err or not data:
+    # one round trip: the bundle carries the details and both recommendation lists
+    bundle, err = api_get_json(
+        f"/movie/{tmdb_id}/bundle", params={"tfidf_top_n": 12, "genre_limits": 12}
+    )
+    if err or not bundle or not bundle.get("movies_details"):
         st.error(f"Failed to fetch movie details: {err}")
         st.stop()
 
+    data = bundle["movies_details"]
+
     left, right = st.columns([1, 2], gap="large")
 
     with left:
@@ -297,33 +414,36 @@ if st.session_state.view == "details":
 
     st.divider()
     st.markdown("### ✅ Recommendations")
-    
-    # for fetching the recommendations
-    
-    title=(data.get("title") or "").strip()
-    if title:
-        bundle, err2 = api_get_json("/movie/search", params={"query": title, "genre_limit": 12, "tfidf_top_n": 12})
-        if not err2 and bundle:
-            st.markdown("### 🔍 Similar Movies (TF-IDF)")
-            tfidf_cards = to_cards_From_Tfidf_items(bundle.get("TFIDF_RECOMMENDATIONS"))
-            if tfidf_cards:
-                poster_grid(
-                    tfidf_cards,
-                    cols=grid_cols,
-                    key_prefix="Detailed_TFIDF_genre"
-                )
-            else:
-                st.info("No TF-IDF recommendations found.")
-
-            st.markdown("### 🎭 Similar Movies (Genre)")
-            genre_cards = bundle.get("GENRE_RECOMMENDATIONS", [])
-            if genre_cards:
-                poster_grid(
-                    genre_cards,
-                    cols=grid_cols,
-                    key_prefix="Detailed_Genre"
-                )
-            else:
-                st.info("No genre recommendations found.")
+
+    st.markdown("### 🔍 Similar Movies (TF-IDF)")
+    tfidf_cards = to_cards_From_Tfidf_items(bundle.get("TFIDF_RECOMMENDATIONS"))
+    if tfidf_cards:
+        poster_grid(
+            tfidf_cards,
+            cols=grid_cols,
+            key_prefix="Detailed_TFIDF_genre"
+        )
+    else:
+        st.info("No TF-IDF recommendations found.")
+
+    st.markdown("### 🎭 Similar Movies (Genre)")
+    genre_cards = bundle.get("GENRE_RECOMMENDATIONS", [])
+    if genre_cards:
+        poster_grid(
+            genre_cards,
+            cols=grid_cols,
+            key_prefix="Detailed_Genre"
+        )
+    else:
+        st.info("No genre recommendations found.")
+
+
+# debug panel: this render's API calls (cache hits show as ~0 ms)
+if show_timings:
+    with st.sidebar.expander("⏱ API timings", expanded=True):
+        timings = st.session_state.api_timings
+        if timings:
+            st.table(timings)
         else:
-            st.warning("Could not fetch recommendations.")
+            st.caption("No API calls in this render.")
+        st.caption(f"Render: {(time.perf_counter() - RENDER_START) * 1000:.0f} ms")
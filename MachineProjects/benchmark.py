@@ -0,0 +1,324 @@
+import argparse
+import json
+import os
+import pickle
+import platform
+import shutil
+import statistics
+import sys
+import tempfile
+import time
+
+import numpy as np
+import pandas as pd
+from sklearn.feature_extraction.text import TfidfVectorizer
+
+# main.py refuses to import without a key; nothing here talks to TMDB
+os.environ.setdefault("TMDB_API_KEY", "benchmark")
+
+import main
+import rebuild_models
+
+
+# Microbenchmarks for the recommendation hot paths on synthetic catalogs.
+#
+#   python benchmark.py --sizes 10000 100000 --out bench.json
+#   python benchmark.py --sizes 10000 100000 --baseline bench.json
+#
+# Each benchmark reports the median and min wall time over --repeat runs; fast
+# calls are looped until one run takes MIN_RUN_SECONDS. With --baseline, a
+# benchmark whose min is more than --threshold slower than the baseline counts
+# as a regression and the script exits with status 1. The min is compared
+# because scheduler and cache noise only ever add time.
+DEFAULT_SIZES = [10_000, 100_000, 1_000_000]
+DEFAULT_REPEAT = 5
+REGRESSION_THRESHOLD = 0.20
+# rebuild() and the top-K table are O(n^2); larger catalogs skip them
+FULL_BUILD_MAX_ROWS = 20_000
+QUERY_SAMPLE = 200
+MIN_RUN_SECONDS = 0.05
+# per-miss p99 target for the fuzzy title lookup
+FUZZY_P99_BUDGET_S = 0.001
+MAX_NUMBER = 100_000
+
+GENRES = list(rebuild_models.TMDB_GENRES.items())
+SYLLABLES = ["ka", "lo", "mi", "ne", "ru", "sa", "ti", "vo", "zel", "dra", "gon",
+             "star", "night", "ar", "en", "is", "on", "ur", "bel", "cor"]
+
+
+def _vocabulary(rng, size=6000):
+    words = set()
+    while len(words) < size:
+        words.add("".join(rng.choice(SYLLABLES, size=rng.integers(2, 5))))
+    return np.array(sorted(words))
+
+
+def synthetic_catalog(n, seed=0):
+    # same columns as MoviesData.csv; word frequencies are Zipf-like so the
+    # TF-IDF matrix has a realistic mix of common and rare terms
+    rng = np.random.default_rng(seed)
+    vocab = _vocabulary(rng)
+    weights = 1.0 / np.arange(1, len(vocab) + 1)
+    weights /= weights.sum()
+
+    def texts(count, lo, hi):
+        lengths = rng.integers(lo, hi, size=count)
+        words = rng.choice(vocab, size=int(lengths.sum()), p=weights)
+        bounds = np.concatenate([[0], np.cumsum(lengths)])
+        return [" ".join(words[bounds[i]:bounds[i + 1]]) for i in range(count)]
+
+    titles = [f"{t.title()} {i}" for i, t in enumerate(texts(n, 1, 4))]
+    genres = []
+    for k in rng.integers(1, 4, size=n):
+        picks = rng.choice(len(GENRES), size=k, replace=False)
+        genres.append(str([{"id": GENRES[p][1], "name": GENRES[p][0]} for p in picks]))
+
+    return pd.DataFrame({
+        "title": titles,
+        "overview": texts(n, 20, 60),
+        "tagline": texts(n, 3, 10),
+        "genres": genres,
+        "vote_average": np.round(rng.uniform(1, 10, size=n), 1),
+        "popularity": rng.pareto(1.5, size=n) * 10,
+    })
+
+
+def _autorange(fn):
+    # like timeit's autorange: grow the loop count until one run is long enough
+    number = 1
+    while number < MAX_NUMBER:
+        start = time.perf_counter()
+        for _ in range(number):
+            fn()
+        if time.perf_counter() - start >= MIN_RUN_SECONDS:
+            break
+        number *= 10
+    return number
+
+
+def _measure(fn, repeat, number=None):
+    if number is None:
+        number = _autorange(fn)
+    times = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        for _ in range(number):
+            fn()
+        times.append((time.perf_counter() - start) / number)
+    return {
+        "median_s": statistics.median(times),
+        "min_s": min(times),
+        "repeat": repeat,
+        "number": number,
+    }
+
+
+def _latencies(fn, inputs, repeat):
+    # one timing per call, for percentiles of lookups that vary by input
+    times = []
+    for _ in range(repeat):
+        for x in inputs:
+            start = time.perf_counter()
+            fn(x)
+            times.append(time.perf_counter() - start)
+    times.sort()
+    return {
+        "median_s": statistics.median(times),
+        "min_s": times[0],
+        "p99_s": times[int(0.99 * (len(times) - 1))],
+        "repeat": repeat,
+        "number": len(inputs),
+    }
+
+
+def _typo(title, rng):
+    # drop one character from the middle, as a near-miss query would
+    i = int(rng.integers(1, max(2, len(title) - 1)))
+    return title[:i] + title[i + 1:]
+
+
+def _point_main_at(workdir):
+    # load_pickle reads module-level paths; redirect them to the synthetic build
+    main.DF_PATH = os.path.join(workdir, "df.pkl")
+    main.INDICES_PATH = os.path.join(workdir, "indices.pkl")
+    main.TFIDF_MATRIX_PATH = os.path.join(workdir, "tfidf_matrix.pkl")
+    main.TFIDF_OBJECT_PATH = os.path.join(workdir, "tfidf.pkl")
+    main.TFIDF_TOPK_PATH = os.path.join(workdir, "tfidf_topk.npz")
+    main.TMDB_MAP_PATH = os.path.join(workdir, "tmdb_map.sqlite")
+    main.ARTIFACTS_DIR = os.path.join(workdir, "artifacts")
+    main.ARTIFACTS_CURRENT_PATH = os.path.join(main.ARTIFACTS_DIR, "CURRENT")
+
+
+def bench_catalog(n, repeat, workdir, full_build_max_rows, workers):
+    results = {}
+    rng = np.random.default_rng(1)
+
+    print(f"[{n}] generating synthetic catalog...")
+    df = synthetic_catalog(n)
+    titles = df["title"].tolist()
+    queries = [titles[i] for i in rng.choice(n, size=min(QUERY_SAMPLE, n), replace=False)]
+
+    # fitted on raw tags: NLTK preprocessing is covered by the rebuild() benchmark
+    tfidf = TfidfVectorizer(stop_words="english")
+    tfidf_matrix = tfidf.fit_transform(rebuild_models.build_tags(df))
+    indices = pd.Series(df.index, index=df["title"]).drop_duplicates()
+
+    for name, obj in [("df.pkl", df), ("indices.pkl", indices),
+                      ("tfidf_matrix.pkl", tfidf_matrix), ("tfidf.pkl", tfidf)]:
+        with open(os.path.join(workdir, name), "wb") as f:
+            pickle.dump(obj, f)
+    _point_main_at(workdir)
+
+    print(f"[{n}] _norm_TITLE / Build_TITLE_TO_INDEX_MAP...")
+    results["_norm_TITLE[all titles]"] = _measure(
+        lambda: [main._norm_TITLE(t) for t in titles], repeat)
+    results["Build_TITLE_TO_INDEX_MAP"] = _measure(
+        lambda: main.Build_TITLE_TO_INDEX_MAP(indices), repeat)
+
+    print(f"[{n}] load_pickle (pickles)...")
+    results["load_pickle[pickle]"] = _measure(main.load_pickle, repeat)
+
+    def recommend_all(top_n):
+        m = main.MODEL
+        for q in queries:
+            main.Tfidf_RECOMMEND_TITLES(q, top_n=top_n, m=m)
+
+    print(f"[{n}] Tfidf_RECOMMEND_TITLES (exact)...")
+    results["Tfidf_RECOMMEND_TITLES[exact, per query]"] = _per_query(
+        _measure(lambda: recommend_all(10), repeat), len(queries))
+
+    if n <= full_build_max_rows:
+        print(f"[{n}] Tfidf_RECOMMEND_TITLES (top-K table)...")
+        nbr_idx, nbr_scores = rebuild_models.build_topk_neighbors(
+            tfidf_matrix, k=rebuild_models.TOPK_NEIGHBORS)
+        np.savez(main.TFIDF_TOPK_PATH, indices=nbr_idx, scores=nbr_scores)
+        main.load_pickle()
+        results["Tfidf_RECOMMEND_TITLES[topk, per query]"] = _per_query(
+            _measure(lambda: recommend_all(10), repeat), len(queries))
+        os.remove(main.TFIDF_TOPK_PATH)
+
+    print(f"[{n}] TITLE_SEARCH_INDEX.fuzzy (near-miss titles)...")
+    typos = [_typo(q, rng) for q in queries]
+    index = main.MODEL.title_index
+    fuzzy = _latencies(index.fuzzy, typos, repeat)
+    results["TITLE_SEARCH_INDEX.fuzzy[per miss]"] = fuzzy
+    if fuzzy["p99_s"] > FUZZY_P99_BUDGET_S:
+        print(f"  fuzzy p99 {fuzzy['p99_s'] * 1000:.2f} ms is over the "
+              f"{FUZZY_P99_BUDGET_S * 1000:.0f} ms budget")
+
+    print(f"[{n}] load_pickle (memory-mapped artifacts)...")
+    rebuild_models.write_mmap_artifacts(main.ARTIFACTS_DIR, df, tfidf_matrix, tfidf, None, None)
+    results["load_pickle[mmap]"] = _measure(main.load_pickle, repeat)
+
+    print(f"[{n}] pydantic response building...")
+    m = main.MODEL
+    rows = main.Tfidf_RECOMMEND_ROWS(queries[0], top_n=50, m=m)
+    cards = [
+        main.TMDBMOVIES_CARD(tmdb_id=i, title=titles[i], poster_url=f"{main.TMDB_IMG_500}/p{i}.jpg",
+                             release_date="2001-01-01", vote_average=7.5)
+        for i, _ in rows
+    ]
+
+    def build_response():
+        items = [
+            main.TFIDFRECITEM(title=titles[i], score=s, tmdb=card)
+            for (i, s), card in zip(rows, cards)
+        ]
+        return [item.model_dump() for item in items]
+
+    results["TFIDFRECITEM[50 items, build+dump]"] = _measure(build_response, repeat)
+    results["TMDBMOVIES_CARD[50 cards]"] = _measure(
+        lambda: [main.TMDBMOVIES_CARD(**c.model_dump()) for c in cards], repeat)
+
+    if n <= full_build_max_rows:
+        results["rebuild"] = bench_rebuild(df, repeat=1, workers=workers)
+
+    return results
+
+
+def _per_query(result, count):
+    return dict(result, median_s=result["median_s"] / count,
+                min_s=result["min_s"] / count, queries=count)
+
+
+def bench_rebuild(df, repeat, workers):
+    # rebuild() works on MoviesData.csv in the current directory
+    print(f"[{len(df)}] rebuild()...")
+    build_dir = tempfile.mkdtemp(prefix="bench_rebuild_")
+    cwd = os.getcwd()
+    try:
+        os.chdir(build_dir)
+        df.to_csv("MoviesData.csv", index=False)
+        return _measure(lambda: rebuild_models.rebuild(workers=workers), repeat, number=1)
+    except Exception as e:
+        # typically missing NLTK data; the rest of the run is still useful
+        print(f"  rebuild() skipped: {e!r}")
+        return {"error": repr(e)}
+    finally:
+        os.chdir(cwd)
+        shutil.rmtree(build_dir, ignore_errors=True)
+
+
+def compare(results, baseline, threshold):
+    regressions = []
+    for size, benches in results["results"].items():
+        for name, res in benches.items():
+            old = baseline.get("results", {}).get(size, {}).get(name)
+            if not old or "min_s" not in old or "min_s" not in res:
+                continue
+            ratio = res["min_s"] / old["min_s"] if old["min_s"] else 1.0
+            flag = "REGRESSION" if ratio > 1 + threshold else ""
+            print(f"  {size:>9} {name:<45} {old['min_s']:.6f}s -> {res['min_s']:.6f}s "
+                  f"({ratio:.2f}x) {flag}")
+            if flag:
+                regressions.append((size, name, ratio))
+    return regressions
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark the recommendation hot paths")
+    parser.add_argument("--sizes", type=int, nargs="+", default=DEFAULT_SIZES,
+                        help="synthetic catalog sizes (rows)")
+    parser.add_argument("--repeat", type=int, default=DEFAULT_REPEAT)
+    parser.add_argument("--out", default="benchmark_results.json")
+    parser.add_argument("--baseline", default=None,
+                        help="previous results JSON to compare against")
+    parser.add_argument("--threshold", type=float, default=REGRESSION_THRESHOLD,
+                        help="allowed slowdown of the min time before a benchmark counts as a regression")
+    parser.add_argument("--full-build-max-rows", type=int, default=FULL_BUILD_MAX_ROWS,
+                        help="largest catalog for the O(n^2) rebuild() and top-K benchmarks")
+    parser.add_argument("--workers", type=int, default=rebuild_models.DEFAULT_WORKERS)
+    args = parser.parse_args()
+
+    results = {
+        "meta": {
+            "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S"),
+            "python": platform.python_version(),
+            "numpy": np.__version__,
+            "platform": platform.platform(),
+            "repeat": args.repeat,
+        },
+        "results": {},
+    }
+
+    for n in args.sizes:
+        workdir = tempfile.mkdtemp(prefix=f"bench_{n}_")
+        try:
+            results["results"][str(n)] = bench_catalog(
+                n, args.repeat, workdir, args.full_build_max_rows, args.workers)
+        finally:
+            shutil.rmtree(workdir, ignore_errors=True)
+
+    with open(args.out, "w") as f:
+        json.dump(results, f, indent=2)
+    print(f"Results written to {args.out}")
+
+    if args.baseline:
+        with open(args.baseline) as f:
+            baseline = json.load(f)
+        print(f"Comparing against {args.baseline} (threshold {args.threshold:.0%}):")
+        regressions = compare(results, baseline, args.threshold)
+        if regressions:
+            print(f"{len(regressions)} regression(s).")
+            sys.exit(1)
+        print("No regressions.")
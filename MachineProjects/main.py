@@ -3,21 +3,41 @@
 # =========================
 
 from ast import keyword
+import asyncio
+import base64
+import gzip
+import hashlib
+import hmac
+import io
+import logging
+import json
 import os
 import pickle
-from typing import Optional, List, Dict, Any, Tuple
+import random
+import re
+import sqlite3
+import threading
+import time
+import unicodedata
+from bisect import bisect_left
+from collections import OrderedDict
+from typing import Optional, List, Dict, Any, Tuple, Sequence
 
 import numpy as np
 import pandas as pd
 import httpx
+from scipy import sparse
 import streamlit as st
 
-from fastapi import FastAPI, HTTPException, Query
+from fastapi import FastAPI, Header, HTTPException, Query, Response
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import JSONResponse, ORJSONResponse, PlainTextResponse
 
 from pydantic import BaseModel, Field
 from dotenv import load_dotenv
 
+import rebuild_models
+
 
 # =========================
 # Environment Setup
@@ -27,20 +47,116 @@ load_dotenv()
 
 TMDB_API_KEY = os.getenv("TMDB_API_KEY")
 TMDB_BASE = "https://api.themoviedb.org/3"
-TMDB_IMG_500 = "https://image.tmdb.org/t/p/w500"
+TMDB_IMG_BASE = "https://image.tmdb.org/t/p"
+TMDB_IMG_500 = f"{TMDB_IMG_BASE}/w500"
+# widths TMDB serves posters at; the proxy fetches the smallest one >= the request
+TMDB_POSTER_SIZES = (92, 154, 185, 342, 500, 780)
 
 if not TMDB_API_KEY:
     raise ValueError("TMDB_API_KEY is missing in the .env file")
 
+# shared TMDB client: pool limits, keep-alive and per-phase timeouts
+TMDB_MAX_CONNECTIONS = int(os.getenv("TMDB_MAX_CONNECTIONS", "20"))
+TMDB_MAX_KEEPALIVE = int(os.getenv("TMDB_MAX_KEEPALIVE", "10"))
+TMDB_KEEPALIVE_EXPIRY = float(os.getenv("TMDB_KEEPALIVE_EXPIRY", "30"))
+TMDB_HTTP2 = os.getenv("TMDB_HTTP2", "false").lower() in {"1", "true", "yes"}
+TMDB_CONNECT_TIMEOUT = float(os.getenv("TMDB_CONNECT_TIMEOUT", "5"))
+TMDB_READ_TIMEOUT = float(os.getenv("TMDB_READ_TIMEOUT", "15"))
+TMDB_WRITE_TIMEOUT = float(os.getenv("TMDB_WRITE_TIMEOUT", "5"))
+TMDB_POOL_TIMEOUT = float(os.getenv("TMDB_POOL_TIMEOUT", "5"))
+
+# in-process TMDB response cache (TTL seconds per endpoint family, 0 = no cache)
+TMDB_CACHE_MAX_ENTRIES = int(os.getenv("TMDB_CACHE_MAX_ENTRIES", "5000"))
+TMDB_CACHE_TTLS: List[Tuple[str, float]] = [
+    ("/trending/", float(os.getenv("TMDB_TTL_TRENDING", "300"))),
+    ("/discover/", float(os.getenv("TMDB_TTL_DISCOVER", "1800"))),
+    ("/search/", float(os.getenv("TMDB_TTL_SEARCH", "3600"))),
+    ("/movie/popular", float(os.getenv("TMDB_TTL_LISTS", "900"))),
+    ("/movie/top_rated", float(os.getenv("TMDB_TTL_LISTS", "900"))),
+    ("/movie/upcoming", float(os.getenv("TMDB_TTL_LISTS", "900"))),
+    ("/movie/now_playing", float(os.getenv("TMDB_TTL_LISTS", "900"))),
+    ("/movie/", float(os.getenv("TMDB_TTL_DETAILS", "86400"))),
+]
+
+# fan-out inside /movie/search: parallel card lookups and per-lookup timeout
+CARD_LOOKUP_CONCURRENCY = int(os.getenv("CARD_LOOKUP_CONCURRENCY", "8"))
+CARD_LOOKUP_TIMEOUT = float(os.getenv("CARD_LOOKUP_TIMEOUT", "4"))
+
+# /poster/{tmdb_id} thumbnail proxy: on-disk LRU of resized posters. When
+# POSTER_PROXY_BASE is set (e.g. http://localhost:8000), card poster_url values
+# point at the proxy instead of image.tmdb.org
+POSTER_PROXY_BASE = os.getenv("POSTER_PROXY_BASE", "").rstrip("/")
+POSTER_CACHE_DIR = os.getenv("POSTER_CACHE_DIR", os.path.join(os.path.dirname(os.path.abspath(__file__)), "poster_cache"))
+POSTER_CACHE_MAX_MB = float(os.getenv("POSTER_CACHE_MAX_MB", "256"))
+POSTER_THUMB_WIDTH = int(os.getenv("POSTER_THUMB_WIDTH", "185"))
+POSTER_MAX_AGE = int(os.getenv("POSTER_MAX_AGE", "604800"))
+
+# /home categories are kept in memory and refreshed in the background every
+# HOME_REFRESH_INTERVAL seconds (+/- HOME_REFRESH_JITTER fraction, 0 = off);
+# entries older than HOME_FEED_MAX_AGE are also revalidated by the next request
+HOME_REFRESH_INTERVAL = float(os.getenv("HOME_REFRESH_INTERVAL", "300"))
+HOME_REFRESH_JITTER = float(os.getenv("HOME_REFRESH_JITTER", "0.2"))
+HOME_FEED_MAX_AGE = float(os.getenv("HOME_FEED_MAX_AGE", "600"))
+
+# fuzzy title lookup: max candidates verified with edit distance, how many of the
+# query's rarest trigrams generate candidates, and trigram posting lists longer
+# than this are skipped when rarer trigrams are available
+FUZZY_MAX_CANDIDATES = int(os.getenv("FUZZY_MAX_CANDIDATES", "32"))
+FUZZY_RAREST_TRIGRAMS = int(os.getenv("FUZZY_RAREST_TRIGRAMS", "6"))
+FUZZY_MAX_POSTING = int(os.getenv("FUZZY_MAX_POSTING", "1000"))
+
+# /autocomplete: prefix ranges wider than AUTOCOMPLETE_SCAN_MAX keys get their top
+# suggestions precomputed; TMDB is searched only below AUTOCOMPLETE_MIN_LOCAL_HITS
+AUTOCOMPLETE_MAX_LIMIT = 20
+AUTOCOMPLETE_SCAN_MAX = int(os.getenv("AUTOCOMPLETE_SCAN_MAX", "2048"))
+AUTOCOMPLETE_MIN_LOCAL_HITS = int(os.getenv("AUTOCOMPLETE_MIN_LOCAL_HITS", "3"))
+
+# live-path similarity engine: "exact" (full sparse product) or "ann"
+# (SVD + IVF candidates from artifacts/, reranked exactly); ANN_NPROBE lists probed
+TFIDF_ENGINE = os.getenv("TFIDF_ENGINE", "exact").lower()
+ANN_NPROBE = int(os.getenv("ANN_NPROBE", str(rebuild_models.ANN_NPROBE)))
+
+# LRU of vectorized free-text queries for /recommend/text
+TEXT_QUERY_CACHE_SIZE = int(os.getenv("TEXT_QUERY_CACHE_SIZE", "2048"))
+
+# local genre recommendations: posting-list prefix scanned when ranking by shared genres
+GENRE_SCAN_DEPTH = int(os.getenv("GENRE_SCAN_DEPTH", "5000"))
+
+# query rows densified per block in POST /recommend/tfidf/batch
+TFIDF_BATCH_BLOCK_ROWS = int(os.getenv("TFIDF_BATCH_BLOCK_ROWS", "256"))
+
+# JSON responses: FAST_JSON renders them with orjson when it is installed; GET
+# bodies of at least RESPONSE_COMPRESS_MIN_BYTES are sent br/gzip-encoded when the
+# client accepts it (0 = off); JSON_ETAGS adds weak ETags and answers If-None-Match
+FAST_JSON = os.getenv("FAST_JSON", "false").lower() in {"1", "true", "yes"}
+RESPONSE_COMPRESS_MIN_BYTES = int(os.getenv("RESPONSE_COMPRESS_MIN_BYTES", "1024"))
+GZIP_LEVEL = int(os.getenv("GZIP_LEVEL", "6"))
+BROTLI_QUALITY = int(os.getenv("BROTLI_QUALITY", "4"))
+JSON_ETAGS = os.getenv("JSON_ETAGS", "true").lower() in {"1", "true", "yes"}
+
+logger = logging.getLogger("movie_api")
+
 
 # =========================
 # FastAPI App + CORS
 # =========================
 
+def _JSON_RESPONSE_CLASS() -> type:
+    if not FAST_JSON:
+        return JSONResponse
+    try:
+        import orjson  # noqa: F401
+    except ImportError:
+        logger.warning("FAST_JSON is set but 'orjson' is not installed; using the json module")
+        return JSONResponse
+    return ORJSONResponse
+
+
 app = FastAPI(
     title="Movie Recommendation System",
     description="Movie Recommendation System",
-    version="2.0.0"
+    version="2.0.0",
+    default_response_class=_JSON_RESPONSE_CLASS(),
 )
 
 app.add_middleware(
@@ -49,9 +165,282 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=["X-Next-Cursor", "ETag"],
 )
 
 
+# =========================
+# Response Encoding
+# =========================
+
+def _LOAD_BROTLI():
+    # brotli is optional; without it clients get gzip
+    try:
+        import brotli
+    except ImportError:
+        return None
+    return brotli
+
+
+BROTLI = _LOAD_BROTLI()
+
+
+def _ACCEPTED_CODINGS(header: str) -> set:
+    out = set()
+    for part in header.split(","):
+        coding, _, params = part.strip().partition(";")
+        q = params.strip()
+        if q.startswith("q="):
+            try:
+                if float(q[2:]) == 0:
+                    continue
+            except ValueError:
+                continue
+        out.add(coding.strip().lower())
+    return out
+
+
+def _ETAG_MATCHES(if_none_match: str, etag: str) -> bool:
+    # weak comparison, as If-None-Match requires
+    tag = etag[2:] if etag.startswith("W/") else etag
+    for t in if_none_match.split(","):
+        t = t.strip()
+        if t == "*" or (t[2:] if t.startswith("W/") else t) == tag:
+            return True
+    return False
+
+
+def _COMPRESS_BODY(body: bytes, accept_encoding: str) -> Tuple[Optional[str], bytes]:
+    accepted = _ACCEPTED_CODINGS(accept_encoding)
+    if BROTLI is not None and "br" in accepted:
+        return "br", BROTLI.compress(body, quality=BROTLI_QUALITY)
+    if "gzip" in accepted:
+        return "gzip", gzip.compress(body, compresslevel=GZIP_LEVEL)
+    return None, body
+
+
+class RESPONSE_ENCODING_MIDDLEWARE:
+    # buffers successful JSON responses to GET: weak ETag over the uncompressed body
+    # (304 on If-None-Match), then br/gzip when the body is large enough. Everything
+    # else (posters, /metrics, errors) passes through untouched
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        enabled = JSON_ETAGS or RESPONSE_COMPRESS_MIN_BYTES > 0
+        if scope["type"] != "http" or scope["method"] != "GET" or not enabled:
+            await self.app(scope, receive, send)
+            return
+
+        request_headers = {
+            k.decode("latin-1").lower(): v.decode("latin-1") for k, v in scope["headers"]
+        }
+        start: Dict[str, Any] = {}
+        chunks: List[bytes] = []
+        passthrough = [False]
+
+        async def send_wrapper(message):
+            if passthrough[0]:
+                await send(message)
+                return
+
+            if message["type"] == "http.response.start":
+                headers = {k.lower(): v for k, v in message.get("headers", [])}
+                if (message["status"] != 200
+                        or not headers.get(b"content-type", b"").startswith(b"application/json")
+                        or b"content-encoding" in headers):
+                    passthrough[0] = True
+                    await send(message)
+                else:
+                    start.update(message)
+                return
+
+            if message["type"] == "http.response.body":
+                chunks.append(message.get("body", b""))
+                if not message.get("more_body", False):
+                    await self._send_encoded(send, start, b"".join(chunks), request_headers)
+                return
+
+            await send(message)
+
+        await self.app(scope, receive, send_wrapper)
+
+    async def _send_encoded(self, send, start, body, request_headers):
+        headers = []
+        vary: List[str] = []
+        for k, v in start.get("headers", []):
+            if k.lower() == b"vary":
+                # keep what inner middleware set (CORS adds Origin)
+                vary.extend(t.strip() for t in v.decode("latin-1").split(",") if t.strip())
+            elif k.lower() not in (b"content-length", b"etag"):
+                headers.append((k, v))
+        if "accept-encoding" not in {t.lower() for t in vary}:
+            vary.append("Accept-Encoding")
+        headers.append((b"vary", ", ".join(vary).encode("latin-1")))
+
+        if JSON_ETAGS:
+            etag = 'W/"' + hashlib.blake2b(body, digest_size=16).hexdigest() + '"'
+            headers.append((b"etag", etag.encode("latin-1")))
+            if_none_match = request_headers.get("if-none-match")
+            if if_none_match and _ETAG_MATCHES(if_none_match, etag):
+                headers = [(k, v) for k, v in headers if k.lower() != b"content-type"]
+                await send({"type": "http.response.start", "status": 304, "headers": headers})
+                await send({"type": "http.response.body", "body": b""})
+                return
+
+        if 0 < RESPONSE_COMPRESS_MIN_BYTES <= len(body):
+            coding, body = _COMPRESS_BODY(body, request_headers.get("accept-encoding", ""))
+            if coding:
+                headers.append((b"content-encoding", coding.encode("latin-1")))
+
+        headers.append((b"content-length", str(len(body)).encode("latin-1")))
+        await send({"type": "http.response.start", "status": start["status"], "headers": headers})
+        await send({"type": "http.response.body", "body": body})
+
+
+# added before METRICS_MIDDLEWARE so request latency includes encoding time
+app.add_middleware(RESPONSE_ENCODING_MIDDLEWARE)
+
+
+# =========================
+# Metrics
+# =========================
+
+METRICS_LATENCY_BUCKETS = (
+    0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0
+)
+
+
+def _METRIC_LABELS(names: Tuple[str, ...], values: Tuple[str, ...]) -> str:
+    if not names:
+        return ""
+    pairs = ",".join(
+        '{}="{}"'.format(
+            n, str(v).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+        )
+        for n, v in zip(names, values)
+    )
+    return "{" + pairs + "}"
+
+
+class LATENCY_HISTOGRAM:
+    # per-label-set bucket counts; observe() is a bisect and three adds under a lock
+    # (TF-IDF scoring observes from worker threads)
+    def __init__(self, name: str, help_text: str, label_names: Tuple[str, ...],
+                 buckets: Tuple[float, ...] = METRICS_LATENCY_BUCKETS):
+        self.name = name
+        self.help_text = help_text
+        self.label_names = label_names
+        self.buckets = buckets
+        self._series: Dict[Tuple[str, ...], List[Any]] = {}
+        self._lock = threading.Lock()
+
+    def observe(self, labels: Tuple[str, ...], seconds: float) -> None:
+        with self._lock:
+            series = self._series.get(labels)
+            if series is None:
+                series = self._series[labels] = [[0] * (len(self.buckets) + 1), 0.0, 0]
+            series[0][bisect_left(self.buckets, seconds)] += 1
+            series[1] += seconds
+            series[2] += 1
+
+    def render(self) -> List[str]:
+        lines = [f"# HELP {self.name} {self.help_text}", f"# TYPE {self.name} histogram"]
+        with self._lock:
+            snapshot = [(k, list(v[0]), v[1], v[2]) for k, v in self._series.items()]
+
+        for labels, counts, total, count in sorted(snapshot):
+            cumulative = 0
+            for le, c in zip(list(self.buckets) + ["+Inf"], counts):
+                cumulative += c
+                lbl = _METRIC_LABELS(self.label_names + ("le",), labels + (str(le),))
+                lines.append(f"{self.name}_bucket{lbl} {cumulative}")
+            lbl = _METRIC_LABELS(self.label_names, labels)
+            lines.append(f"{self.name}_sum{lbl} {total:.6f}")
+            lines.append(f"{self.name}_count{lbl} {count}")
+        return lines
+
+
+class METRIC_COUNTER:
+    def __init__(self, name: str, help_text: str, label_names: Tuple[str, ...]):
+        self.name = name
+        self.help_text = help_text
+        self.label_names = label_names
+        self._values: Dict[Tuple[str, ...], int] = {}
+
+    def inc(self, labels: Tuple[str, ...], n: int = 1) -> None:
+        self._values[labels] = self._values.get(labels, 0) + n
+
+    def render(self) -> List[str]:
+        lines = [f"# HELP {self.name} {self.help_text}", f"# TYPE {self.name} counter"]
+        for labels, value in sorted(self._values.items()):
+            lines.append(f"{self.name}{_METRIC_LABELS(self.label_names, labels)} {value}")
+        return lines
+
+
+HTTP_REQUEST_SECONDS = LATENCY_HISTOGRAM(
+    "http_request_duration_seconds", "Request latency by route template",
+    ("method", "route", "status"),
+)
+TMDB_REQUEST_SECONDS = LATENCY_HISTOGRAM(
+    "tmdb_request_duration_seconds", "Upstream TMDB call latency by path",
+    ("path",),
+)
+TMDB_REQUEST_ERRORS = METRIC_COUNTER(
+    "tmdb_request_errors_total", "Failed upstream TMDB calls by path and reason",
+    ("path", "reason"),
+)
+TFIDF_SCORING_SECONDS = LATENCY_HISTOGRAM(
+    "tfidf_scoring_duration_seconds", "TF-IDF neighbour scoring time by engine",
+    ("engine",),
+)
+
+HTTP_IN_FLIGHT = 0
+
+_TMDB_PATH_IDS = re.compile(r"/\d+(?=/|$)")
+
+
+def _TMDB_METRIC_PATH(path: str) -> str:
+    # /movie/550/credits -> /movie/{id}/credits keeps label cardinality bounded
+    return _TMDB_PATH_IDS.sub("/{id}", path)
+
+
+class METRICS_MIDDLEWARE:
+    # plain ASGI middleware: no per-request task or body wrapping
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        global HTTP_IN_FLIGHT
+
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        status = [500]
+
+        async def send_wrapper(message):
+            if message["type"] == "http.response.start":
+                status[0] = message["status"]
+            await send(message)
+
+        HTTP_IN_FLIGHT += 1
+        start = time.perf_counter()
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            HTTP_IN_FLIGHT -= 1
+            # the router stores the matched route in scope; unmatched paths share one label
+            route = scope.get("route")
+            HTTP_REQUEST_SECONDS.observe(
+                (scope["method"], getattr(route, "path", "unmatched"), str(status[0])),
+                time.perf_counter() - start,
+            )
+
+
+app.add_middleware(METRICS_MIDDLEWARE)
+
+
 # =========================
 # File Paths
 # =========================
@@ -62,18 +451,82 @@ DF_PATH = os.path.join(BASE_DIR, "df.pkl")
 INDICES_PATH = os.path.join(BASE_DIR, "indices.pkl")
 TFIDF_MATRIX_PATH = os.path.join(BASE_DIR, "tfidf_matrix.pkl")
 TFIDF_OBJECT_PATH = os.path.join(BASE_DIR, "tfidf.pkl")
+TFIDF_TOPK_PATH = os.path.join(BASE_DIR, "tfidf_topk.npz")
+TMDB_MAP_PATH = os.path.join(BASE_DIR, "tmdb_map.sqlite")
+
+# memory-mapped artifacts written by rebuild_models.py; preferred over the pickles.
+# Builds live in artifacts/versions/<build_id>/ and artifacts/CURRENT names the
+# live one (a flat artifacts/manifest.json is still accepted).
+ARTIFACTS_DIR = os.path.join(BASE_DIR, "artifacts")
+ARTIFACTS_CURRENT_PATH = os.path.join(ARTIFACTS_DIR, "CURRENT")
+ARTIFACTS_FORMAT_VERSION = 1
+
+# hot reload: poll interval for new artifacts (0 = off) and the token required
+# by POST /admin/reload (the endpoint is disabled while it is unset)
+ARTIFACTS_WATCH_INTERVAL = float(os.getenv("ARTIFACTS_WATCH_INTERVAL", "0"))
+ADMIN_TOKEN = os.getenv("ADMIN_TOKEN")
 
 
 # =========================
 # Global Objects (loaded once)
 # =========================
 
-df: Optional[pd.DataFrame] = None
-indices_obj: Any = None
-tfidf_matrix: Any = None
-tfidf_object: Any = None
+# the loaded recommendation model; replaced as a whole on reload
+MODEL: Optional["MODEL_STATE"] = None
+MODEL_FINGERPRINT: Optional[str] = None
+RELOAD_LOCK: Optional[asyncio.Lock] = None
+ARTIFACTS_WATCH_TASK: Optional[asyncio.Task] = None
+
+TMDB_CLIENT: Optional[httpx.AsyncClient] = None
+TMDB_IN_FLIGHT = 0
+
+
+# =========================
+# Response Cache
+# =========================
+
+class TTL_LRU_CACHE:
+    # locked: the text query cache is used from asyncio.to_thread workers
+    def __init__(self, max_entries: int):
+        self.max_entries = max_entries
+        self._data: "OrderedDict[str, Tuple[float, Any]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key: str) -> Optional[Any]:
+        with self._lock:
+            entry = self._data.get(key)
+            if entry is None:
+                self.misses += 1
+                return None
+
+            expires_at, value = entry
+            if expires_at < time.monotonic():
+                del self._data[key]
+                self.misses += 1
+                return None
+
+            self._data.move_to_end(key)
+            self.hits += 1
+            return value
+
+    def set(self, key: str, value: Any, ttl: float) -> None:
+        with self._lock:
+            self._data[key] = (time.monotonic() + ttl, value)
+            self._data.move_to_end(key)
+            while len(self._data) > self.max_entries:
+                self._data.popitem(last=False)
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+
+TMDB_RESPONSE_CACHE = TTL_LRU_CACHE(TMDB_CACHE_MAX_ENTRIES)
+
+# key -> task of the single upstream call shared by concurrent cache misses
+TMDB_PENDING: Dict[str, "asyncio.Task[Dict[str, Any]]"] = {}
 
-TITLE_TO_INDEX: Optional[Dict[str, int]] = None
 
 
 # =========================
@@ -111,6 +564,20 @@ class SEARCHBUNDLERESPONSE(BaseModel):
     GENRE_RECOMMENDATIONS: List[TMDBMOVIES_CARD]
 
 
+class TFIDFBATCHREQUEST(BaseModel):
+    titles: List[str] = Field(..., min_length=1, max_length=200)
+    top_n: int = Field(10, ge=1, le=50)
+
+
+class TFIDFBATCHRESULT(BaseModel):
+    items: List[TFIDFRECITEM] = Field(default_factory=list)
+    error: Optional[str] = None
+
+
+class TFIDFBATCHRESPONSE(BaseModel):
+    results: Dict[str, TFIDFBATCHRESULT]
+
+
 # =========================
 # Utility Functions
 # =========================
@@ -119,9 +586,12 @@ def _norm_TITLE(t: str) -> str:
     return str(t).strip().lower()
 
 
-def MAKE_IMAGE_URL(path: Optional[str]) -> Optional[str]:
+def MAKE_IMAGE_URL(path: Optional[str], tmdb_id: Optional[int] = None) -> Optional[str]:
     if not path:
         return None
+    # grid cards go through the local thumbnail proxy when it is configured
+    if POSTER_PROXY_BASE and tmdb_id is not None:
+        return f"{POSTER_PROXY_BASE}/poster/{int(tmdb_id)}"
     return f"{TMDB_IMG_500}{path}"
 
 
@@ -129,20 +599,129 @@ def MAKE_IMAGE_URL(path: Optional[str]) -> Optional[str]:
 # TMDB API Helpers
 # =========================
 
+def BUILD_TMDB_CLIENT() -> httpx.AsyncClient:
+    http2 = TMDB_HTTP2
+    if http2:
+        try:
+            import h2  # noqa: F401
+        except ImportError:
+            logger.warning("TMDB_HTTP2 is set but 'h2' is not installed; using HTTP/1.1")
+            http2 = False
+
+    return httpx.AsyncClient(
+        base_url=TMDB_BASE,
+        http2=http2,
+        limits=httpx.Limits(
+            max_connections=TMDB_MAX_CONNECTIONS,
+            max_keepalive_connections=TMDB_MAX_KEEPALIVE,
+            keepalive_expiry=TMDB_KEEPALIVE_EXPIRY,
+        ),
+        timeout=httpx.Timeout(
+            connect=TMDB_CONNECT_TIMEOUT,
+            read=TMDB_READ_TIMEOUT,
+            write=TMDB_WRITE_TIMEOUT,
+            pool=TMDB_POOL_TIMEOUT,
+        ),
+    )
+
+
+def _GET_TMDB_CLIENT() -> httpx.AsyncClient:
+    global TMDB_CLIENT
+
+    # normally opened by the startup hook; created lazily for scripts and tests
+    if TMDB_CLIENT is None or TMDB_CLIENT.is_closed:
+        TMDB_CLIENT = BUILD_TMDB_CLIENT()
+    return TMDB_CLIENT
+
+
+def _TMDB_CACHE_KEY(path: str, params: Dict[str, Any]) -> str:
+    norm = sorted((str(k), str(v).strip().lower()) for k, v in params.items())
+    return path + "?" + "&".join(f"{k}={v}" for k, v in norm)
+
+
+def _TMDB_TTL_FOR(path: str) -> float:
+    for prefix, ttl in TMDB_CACHE_TTLS:
+        if path.startswith(prefix):
+            return ttl
+    return 0.0
+
+
 async def TMDB_get(path: str, params: Dict[str, Any]) -> Dict[str, Any]:
+    ttl = _TMDB_TTL_FOR(path)
+    if ttl <= 0:
+        return await _TMDB_FETCH(path, params)
+
+    key = _TMDB_CACHE_KEY(path, params)
+    cached = TMDB_RESPONSE_CACHE.get(key)
+    if cached is not None:
+        return cached
+
+    # single-flight: concurrent misses on the same key await one upstream call
+    task = TMDB_PENDING.get(key)
+    if task is None:
+        task = asyncio.ensure_future(_TMDB_FETCH_AND_STORE(key, ttl, path, params))
+        task.add_done_callback(lambda t: t.cancelled() or t.exception())
+        TMDB_PENDING[key] = task
+
+    # shield so one cancelled caller does not cancel the call for everyone else
+    return await asyncio.shield(task)
+
+
+async def _TMDB_FETCH_AND_STORE(
+    key: str,
+    ttl: float,
+    path: str,
+    params: Dict[str, Any]
+) -> Dict[str, Any]:
+    try:
+        data = await _TMDB_FETCH(path, params)
+        TMDB_RESPONSE_CACHE.set(key, data, ttl)
+        return data
+    finally:
+        TMDB_PENDING.pop(key, None)
+
+
+async def _TMDB_FETCH(path: str, params: Dict[str, Any]) -> Dict[str, Any]:
+    global TMDB_IN_FLIGHT
+
     q = dict(params)
     q["api_key"] = TMDB_API_KEY
 
+    client = _GET_TMDB_CLIENT()
+
+    if TMDB_IN_FLIGHT >= TMDB_MAX_CONNECTIONS:
+        logger.warning(
+            "TMDB pool saturated: %d requests in flight (max_connections=%d), %s will queue",
+            TMDB_IN_FLIGHT, TMDB_MAX_CONNECTIONS, path,
+        )
+
+    metric_path = _TMDB_METRIC_PATH(path)
+    TMDB_IN_FLIGHT += 1
+    start = time.perf_counter()
     try:
-        async with httpx.AsyncClient(timeout=20.0) as client:
-            response = await client.get(f"{TMDB_BASE}{path}", params=q)
+        response = await client.get(path, params=q)
+    except httpx.PoolTimeout as e:
+        TMDB_REQUEST_ERRORS.inc((metric_path, "pool_timeout"))
+        logger.error(
+            "TMDB pool exhausted: waited %.1fs for a connection for %s",
+            TMDB_POOL_TIMEOUT, path,
+        )
+        raise HTTPException(
+            status_code=503,
+            detail=f"TMDB connection pool exhausted: {repr(e)}"
+        )
     except httpx.HTTPError as e:
+        TMDB_REQUEST_ERRORS.inc((metric_path, type(e).__name__))
         raise HTTPException(
             status_code=500,
             detail=f"TMDB request error: {type(e).__name__} | {repr(e)}"
         )
+    finally:
+        TMDB_IN_FLIGHT -= 1
+        TMDB_REQUEST_SECONDS.observe((metric_path,), time.perf_counter() - start)
 
     if response.status_code != 200:
+        TMDB_REQUEST_ERRORS.inc((metric_path, str(response.status_code)))
         raise HTTPException(
             status_code=502,
             detail=f"TMDB error {response.status_code}: {response.text}"
@@ -163,7 +742,7 @@ async def TMDB_CARD_FROM_RESULT(
             TMDBMOVIES_CARD(
                 tmdb_id=int(m.get("id")),
                 title=m.get("title") or m.get("name") or "",
-                poster_url=MAKE_IMAGE_URL(m.get("poster_path")),
+                poster_url=MAKE_IMAGE_URL(m.get("poster_path"), m.get("id")),
                 release_date=m.get("release_date"),
                 vote_average=m.get("vote_average"),
             )
@@ -204,6 +783,485 @@ async def TMDB_SEARCH_FIRST(query: str) -> Optional[Dict]:
     return results[0] if results else None
 
 
+async def TMDB_GENRE_CARDS(
+    genre_id: int,
+    limit: int,
+    exclude_tmdb_id: Optional[int] = None
+) -> List[TMDBMOVIES_CARD]:
+    discover = await TMDB_get(
+        "/discover/movie",
+        {
+            "with_genres": genre_id,
+            "language": "en-us",
+            "sort_by": "popularity.desc",
+            "page": 1,
+        }
+    )
+
+    cards = await TMDB_CARD_FROM_RESULT(discover.get("results", []), limit)
+    return [c for c in cards if c.tmdb_id != exclude_tmdb_id]
+
+
+# =========================
+# Home Feed Store
+# =========================
+
+HOME_CATEGORIES: Dict[str, Tuple[str, Dict[str, Any]]] = {
+    "trending": ("/trending/movie/day", {"language": "en-us"}),
+    "popular": ("/movie/popular", {"language": "en-us", "page": 1}),
+    "top_rated": ("/movie/top_rated", {"language": "en-us", "page": 1}),
+    "upcoming": ("/movie/upcoming", {"language": "en-us", "page": 1}),
+    "now_playing": ("/movie/now_playing", {"language": "en-us", "page": 1}),
+}
+
+# TMDB list pages hold 20 results and stop at page 500
+HOME_PAGE_SIZE = 20
+HOME_MAX_PAGE = 500
+
+# stale-while-revalidate for page 1: category -> (fetched_at monotonic, cards,
+# total_pages); entries are only ever replaced by a successful refresh, so TMDB
+# outages serve stale cards
+HOME_FEED_STORE: Dict[str, Tuple[float, List[TMDBMOVIES_CARD], int]] = {}
+HOME_REFRESHING: Dict[str, "asyncio.Task[Tuple[List[TMDBMOVIES_CARD], int]]"] = {}
+HOME_REFRESH_TASKS: List["asyncio.Task[None]"] = []
+
+
+async def _FETCH_HOME_CATEGORY(category: str) -> Tuple[List[TMDBMOVIES_CARD], int]:
+    # straight to TMDB: the response cache TTL would otherwise hide fresh lists
+    path, params = HOME_CATEGORIES[category]
+    data = await _TMDB_FETCH(path, params)
+    cards = await TMDB_CARD_FROM_RESULT(data.get("results", []), HOME_PAGE_SIZE)
+    total_pages = int(data.get("total_pages") or 1)
+    HOME_FEED_STORE[category] = (time.monotonic(), cards, total_pages)
+    return cards, total_pages
+
+
+def REFRESH_HOME_CATEGORY(category: str) -> "asyncio.Task[Tuple[List[TMDBMOVIES_CARD], int]]":
+    # one refresh per category at a time, shared by the refresher and requests
+    task = HOME_REFRESHING.get(category)
+    if task is None:
+        task = asyncio.ensure_future(_FETCH_HOME_CATEGORY(category))
+        task.add_done_callback(lambda t: HOME_REFRESHING.pop(category, None))
+        task.add_done_callback(lambda t: t.cancelled() or t.exception())
+        HOME_REFRESHING[category] = task
+    return task
+
+
+async def HOME_REFRESH_LOOP(category: str):
+    while True:
+        try:
+            await asyncio.shield(REFRESH_HOME_CATEGORY(category))
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            logger.warning("Home feed refresh for %s failed, serving stale data: %r", category, e)
+
+        # jitter keeps the categories (and workers) from refreshing in lockstep
+        jitter = random.uniform(-HOME_REFRESH_JITTER, HOME_REFRESH_JITTER)
+        await asyncio.sleep(HOME_REFRESH_INTERVAL * (1 + jitter))
+
+
+async def HOME_PAGE(category: str, page: int) -> Tuple[List[TMDBMOVIES_CARD], int]:
+    # page 1 comes from the pre-warmed store; deeper pages go through the
+    # regular TMDB response cache
+    if page == 1:
+        entry = HOME_FEED_STORE.get(category)
+        if entry is None:
+            # cold start before the refresher got there (or refresher disabled)
+            return await asyncio.shield(REFRESH_HOME_CATEGORY(category))
+
+        fetched_at, cards, total_pages = entry
+        if time.monotonic() - fetched_at > HOME_FEED_MAX_AGE:
+            REFRESH_HOME_CATEGORY(category)
+        return cards, total_pages
+
+    path, params = HOME_CATEGORIES[category]
+    data = await TMDB_get(path, dict(params, page=page))
+    cards = await TMDB_CARD_FROM_RESULT(data.get("results", []), HOME_PAGE_SIZE)
+    return cards, int(data.get("total_pages") or page)
+
+
+def ENCODE_HOME_CURSOR(page: int, offset: int) -> str:
+    return base64.urlsafe_b64encode(f"{page}:{offset}".encode()).decode().rstrip("=")
+
+
+def DECODE_HOME_CURSOR(cursor: str) -> Tuple[int, int]:
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        page, offset = base64.urlsafe_b64decode(padded.encode()).decode().split(":")
+        page, offset = int(page), int(offset)
+    except (ValueError, UnicodeDecodeError):
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+
+    if not (1 <= page <= HOME_MAX_PAGE and 0 <= offset < HOME_PAGE_SIZE):
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+    return page, offset
+
+
+# =========================
+# Poster Thumbnail Cache
+# =========================
+
+class DISK_LRU_CACHE:
+    # one file per key in a directory, evicted least recently used first once the
+    # total size passes max_bytes; hits bump the file mtime so the order survives
+    # restarts. Blocking file IO: call from a worker thread.
+    def __init__(self, directory: str, max_bytes: int):
+        self.directory = directory
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+        self._index: Optional["OrderedDict[str, int]"] = None
+        self._total = 0
+        self._lock = threading.Lock()
+
+    def _load_index(self) -> "OrderedDict[str, int]":
+        if self._index is None:
+            os.makedirs(self.directory, exist_ok=True)
+            entries = []
+            for name in os.listdir(self.directory):
+                if name.endswith(".tmp"):
+                    continue
+                info = os.stat(os.path.join(self.directory, name))
+                entries.append((info.st_mtime, name, info.st_size))
+            self._index = OrderedDict((name, size) for _, name, size in sorted(entries))
+            self._total = sum(self._index.values())
+        return self._index
+
+    def get(self, key: str) -> Optional[bytes]:
+        path = os.path.join(self.directory, key)
+        with self._lock:
+            index = self._load_index()
+            if key not in index:
+                self.misses += 1
+                return None
+            index.move_to_end(key)
+
+        try:
+            with open(path, "rb") as f:
+                data = f.read()
+            os.utime(path)
+        except FileNotFoundError:
+            # evicted by another worker sharing the directory
+            with self._lock:
+                self._total -= index.pop(key, 0)
+                self.misses += 1
+            return None
+
+        self.hits += 1
+        return data
+
+    def __len__(self) -> int:
+        return len(self._index or {})
+
+    def set(self, key: str, data: bytes) -> None:
+        path = os.path.join(self.directory, key)
+        tmp = f"{path}.{os.getpid()}.tmp"
+        with self._lock:
+            index = self._load_index()
+            with open(tmp, "wb") as f:
+                f.write(data)
+            os.replace(tmp, path)
+
+            self._total += len(data) - index.pop(key, 0)
+            index[key] = len(data)
+            while self._total > self.max_bytes and len(index) > 1:
+                old, size = index.popitem(last=False)
+                self._total -= size
+                try:
+                    os.remove(os.path.join(self.directory, old))
+                except FileNotFoundError:
+                    pass
+
+
+POSTER_CACHE = DISK_LRU_CACHE(POSTER_CACHE_DIR, int(POSTER_CACHE_MAX_MB * 2 ** 20))
+POSTER_PENDING: Dict[str, "asyncio.Task[bytes]"] = {}
+
+
+def _RESIZE_POSTER(data: bytes, width: int) -> bytes:
+    # Pillow is optional; without it the nearest TMDB size is cached as-is
+    try:
+        from PIL import Image
+    except ImportError:
+        return data
+
+    img = Image.open(io.BytesIO(data))
+    if img.width <= width:
+        return data
+    img = img.convert("RGB")
+    img.thumbnail((width, int(img.height * width / img.width) + 1), Image.LANCZOS)
+    out = io.BytesIO()
+    img.save(out, format="JPEG", quality=85, optimize=True, progressive=True)
+    return out.getvalue()
+
+
+async def _FETCH_POSTER(tmdb_id: int, width: int, key: str) -> bytes:
+    try:
+        # shares the details cache entry with /movie/id/{tmdb_id}
+        data = await TMDB_get(f"/movie/{tmdb_id}", {"language": "en-US"})
+        poster_path = data.get("poster_path")
+        if not poster_path:
+            raise HTTPException(status_code=404, detail="No poster for this movie")
+
+        size = next((s for s in TMDB_POSTER_SIZES if s >= width), TMDB_POSTER_SIZES[-1])
+        try:
+            response = await _GET_TMDB_CLIENT().get(f"{TMDB_IMG_BASE}/w{size}{poster_path}")
+        except httpx.HTTPError as e:
+            raise HTTPException(
+                status_code=502,
+                detail=f"TMDB image error: {type(e).__name__} | {repr(e)}"
+            )
+        if response.status_code != 200:
+            raise HTTPException(
+                status_code=502,
+                detail=f"TMDB image error {response.status_code}"
+            )
+
+        thumb = await asyncio.to_thread(_RESIZE_POSTER, response.content, width)
+        await asyncio.to_thread(POSTER_CACHE.set, key, thumb)
+        return thumb
+    finally:
+        POSTER_PENDING.pop(key, None)
+
+
+async def GET_POSTER_THUMB(tmdb_id: int, width: int) -> bytes:
+    key = f"{tmdb_id}_w{width}.jpg"
+    data = await asyncio.to_thread(POSTER_CACHE.get, key)
+    if data is not None:
+        return data
+
+    # single-flight per thumbnail, like TMDB_get
+    task = POSTER_PENDING.get(key)
+    if task is None:
+        task = asyncio.ensure_future(_FETCH_POSTER(tmdb_id, width, key))
+        task.add_done_callback(lambda t: t.cancelled() or t.exception())
+        POSTER_PENDING[key] = task
+    return await asyncio.shield(task)
+
+
+# =========================
+# Title Search Index
+# =========================
+
+def _FOLD_TITLE(t: str) -> str:
+    # accent, case and punctuation folding: "Spider-Man " / "spiderman" -> "spiderman"
+    t = unicodedata.normalize("NFKD", str(t))
+    t = "".join(ch for ch in t if not unicodedata.combining(ch))
+    return "".join(ch for ch in t.lower() if ch.isalnum())
+
+
+def _TRIGRAMS(key: str) -> List[str]:
+    return [key[i:i + 3] for i in range(len(key) - 2)]
+
+
+def _MAX_EDITS(key: str) -> int:
+    if len(key) <= 4:
+        return 0
+    if len(key) <= 8:
+        return 1
+    if len(key) <= 16:
+        return 2
+    return 3
+
+
+def _BOUNDED_EDIT_DISTANCE(a: str, b: str, max_d: int) -> int:
+    # optimal string alignment (adjacent swaps cost 1); returns max_d + 1 once exceeded
+    if abs(len(a) - len(b)) > max_d:
+        return max_d + 1
+
+    prev2: List[int] = []
+    prev = list(range(len(b) + 1))
+    for i in range(1, len(a) + 1):
+        cur = [i] + [0] * len(b)
+        row_min = i
+        for j in range(1, len(b) + 1):
+            cost = 0 if a[i - 1] == b[j - 1] else 1
+            v = min(prev[j] + 1, cur[j - 1] + 1, prev[j - 1] + cost)
+            if (i > 1 and j > 1 and a[i - 1] == b[j - 2]
+                    and a[i - 2] == b[j - 1]):
+                v = min(v, prev2[j - 2] + 1)
+            cur[j] = v
+            row_min = min(row_min, v)
+        if row_min > max_d:
+            return max_d + 1
+        prev2, prev = prev, cur
+
+    return prev[-1]
+
+
+class TITLE_SEARCH_INDEX:
+    def __init__(self, title_to_index: Dict[str, int]):
+        self.exact: Dict[str, int] = {}
+        for title, row in title_to_index.items():
+            self.exact.setdefault(_FOLD_TITLE(title), row)
+        self.exact.pop("", None)
+
+        self.keys: List[str] = sorted(self.exact)
+        self.rows: List[int] = [self.exact[k] for k in self.keys]
+        self.key_lens = np.fromiter((len(k) for k in self.keys), dtype=np.int32,
+                                    count=len(self.keys))
+
+        postings: Dict[str, List[int]] = {}
+        for n, key in enumerate(self.keys):
+            for g in set(_TRIGRAMS(key)):
+                postings.setdefault(g, []).append(n)
+        self.postings = {g: np.asarray(p, dtype=np.int32) for g, p in postings.items()}
+
+    def prefix(self, query: str, limit: int = 10) -> List[int]:
+        # key positions (into self.keys) starting with the folded query
+        q = _FOLD_TITLE(query)
+        if not q:
+            return []
+        start = bisect_left(self.keys, q)
+        out: List[int] = []
+        for n in range(start, min(start + limit, len(self.keys))):
+            if not self.keys[n].startswith(q):
+                break
+            out.append(n)
+        return out
+
+    def fuzzy(self, query: str) -> Optional[int]:
+        q = _FOLD_TITLE(query)
+        max_d = _MAX_EDITS(q)
+        grams = _TRIGRAMS(q)
+        if max_d == 0 or not grams:
+            return None
+
+        lists = sorted(
+            (self.postings[g] for g in set(grams) if g in self.postings),
+            key=len,
+        )
+        if not lists:
+            return None
+
+        # one edit changes at most three trigrams, so 3 * max_d + 1 of the rarest
+        # ones always include one that a key within max_d edits still shares;
+        # very common trigrams add little and are dropped when rarer ones remain
+        k = max(FUZZY_RAREST_TRIGRAMS, 3 * max_d + 1)
+        selective = [p for p in lists[:k] if len(p) <= FUZZY_MAX_POSTING] or lists[:1]
+
+        cand = np.concatenate(selective)
+        cand = cand[np.abs(self.key_lens[cand] - len(q)) <= max_d]
+        found, counts = np.unique(cand, return_counts=True)
+
+        # q-gram bound: within max_d edits a key shares all but 3 * max_d of them
+        keep = counts >= max(1, len(selective) - 3 * max_d)
+        found, counts = found[keep], counts[keep]
+        order = np.argsort(-counts, kind="stable")[:FUZZY_MAX_CANDIDATES]
+
+        best: Optional[Tuple[int, int]] = None
+        for n in found[order].tolist():
+            d = _BOUNDED_EDIT_DISTANCE(q, self.keys[n], max_d)
+            if d <= max_d and (best is None or d < best[0]):
+                best = (d, n)
+                if d == 1:
+                    break
+
+        return self.rows[best[1]] if best else None
+
+    def resolve(self, title: str, near_miss: bool = True) -> Optional[int]:
+        # near_miss=False keeps to folded exact matches, for titles that come from
+        # TMDB rather than a user and may simply not be in the catalog
+        q = _FOLD_TITLE(title)
+        if not q:
+            return None
+
+        if q in self.exact:
+            return self.exact[q]
+        if not near_miss:
+            return None
+
+        row = self.fuzzy(title)
+        if row is not None:
+            return row
+
+        # a long enough prefix ("the dark knight ris") only counts when it is unique;
+        # "robot 9" must not turn into "robot 981"
+        if len(q) >= 6:
+            hits = self.prefix(title, limit=2)
+            if len(hits) == 1:
+                return self.rows[hits[0]]
+
+        return None
+
+
+def _PREFIX_UPPER(q: str) -> str:
+    # smallest string greater than every string starting with q
+    return q[:-1] + chr(ord(q[-1]) + 1)
+
+
+class AUTOCOMPLETE_INDEX:
+    # folded title suffixes starting at each word ("The Dark Knight" -> "thedarkknight",
+    # "darkknight", "knight"), sorted so a typed prefix is one bisect range. Within a
+    # range, full-title matches come first, each tier in popularity rank order
+    def __init__(self, titles: Sequence[str], rows: Sequence[int], rank: np.ndarray):
+        entries: List[Tuple[str, int, bool]] = []
+        for title, row in zip(titles, rows):
+            words = str(title).split()
+            seen = set()
+            for i in range(len(words)):
+                key = _FOLD_TITLE(" ".join(words[i:]))
+                if key and key not in seen:
+                    seen.add(key)
+                    entries.append((key, int(row), i > 0))
+        entries.sort()
+
+        self.keys: List[str] = [e[0] for e in entries]
+        self.rows = np.fromiter((e[1] for e in entries), dtype=np.int64, count=len(entries))
+        inner = np.fromiter((e[2] for e in entries), dtype=bool, count=len(entries))
+        self.order = np.asarray(rank, dtype=np.int64)[self.rows] + inner * len(rank)
+
+        # short prefixes ("t", "th", "the") span a large share of the keys; rank
+        # those ranges once here so every lookup stays a small scan
+        self.top: Dict[str, List[int]] = {}
+        stack = [("", 0, len(self.keys))]
+        while stack:
+            prefix, start, end = stack.pop()
+            if prefix:
+                self.top[prefix] = self._rank_range(start, end, AUTOCOMPLETE_MAX_LIMIT)
+            i = start
+            while i < end:
+                if len(self.keys[i]) == len(prefix):
+                    i += 1
+                    continue
+                child = self.keys[i][:len(prefix) + 1]
+                j = bisect_left(self.keys, _PREFIX_UPPER(child), i, end)
+                if j - i > AUTOCOMPLETE_SCAN_MAX:
+                    stack.append((child, i, j))
+                i = j
+
+    def __len__(self) -> int:
+        return len(self.keys)
+
+    def _rank_range(self, start: int, end: int, limit: int) -> List[int]:
+        order = self.order[start:end]
+        # a row can hold several keys in one range ("Star Wars Star"); keep spares
+        k = min(len(order), 2 * limit)
+        if k == 0:
+            return []
+        idx = np.argpartition(order, k - 1)[:k] if k < len(order) else np.arange(k)
+        idx = idx[np.argsort(order[idx], kind="stable")]
+
+        out: List[int] = []
+        for row in self.rows[start + idx].tolist():
+            if row not in out:
+                out.append(row)
+                if len(out) == limit:
+                    break
+        return out
+
+    def search(self, query: str, limit: int = 10) -> List[int]:
+        q = _FOLD_TITLE(query)
+        if not q:
+            return []
+        top = self.top.get(q)
+        if top is not None:
+            return top[:limit]
+        start = bisect_left(self.keys, q)
+        end = bisect_left(self.keys, _PREFIX_UPPER(q), start)
+        return self._rank_range(start, end, limit)
+
+
 # =========================
 # TF-IDF Helpers
 # =========================
@@ -217,60 +1275,325 @@ def Build_TITLE_TO_INDEX_MAP(indices: Any) -> Dict[str, int]:
     return title_to_idx
 
 
-def get_local_IDX_BY_title(title: str) -> int:
-    global TITLE_TO_INDEX
-
-    if TITLE_TO_INDEX is None:
+def _CURRENT_MODEL() -> "MODEL_STATE":
+    # callers take one reference per request so a reload never mixes versions
+    m = MODEL
+    if m is None:
         raise HTTPException(
             status_code=500,
-            detail="Title-to-index mapping not loaded"
+            detail="TF-IDF model not loaded"
         )
+    return m
+
+
+def get_local_IDX_BY_title(
+    title: str,
+    m: Optional["MODEL_STATE"] = None,
+    near_miss: bool = True
+) -> int:
+    m = m or _CURRENT_MODEL()
 
     key = _norm_TITLE(title)
-    if key not in TITLE_TO_INDEX:
+    if key in m.title_to_index:
+        return m.title_to_index[key]
+
+    # near-misses: folded exact match, then bounded edit distance, then prefix
+    row = m.title_index.resolve(title, near_miss=near_miss)
+    if row is None:
         raise HTTPException(
             status_code=404,
             detail=f"Movie '{title}' not found in dataset"
         )
 
-    return TITLE_TO_INDEX[key]
+    return row
 
 
-def Tfidf_RECOMMEND_TITLES(
-    query_title: str,
-    top_n: int = 10
-) -> List[Tuple[str, float]]:
+def _TOPK_ORDER(scores: np.ndarray, k: int) -> np.ndarray:
+    # indices of the k largest scores, best first, without a full sort
+    k = min(k, scores.shape[0])
+    if k <= 0:
+        return np.empty(0, dtype=np.int64)
 
-    global df, tfidf_matrix
+    part = np.argpartition(-scores, k - 1)[:k]
+    return part[np.argsort(-scores[part], kind="stable")]
 
-    if df is None or tfidf_matrix is None:
-        raise HTTPException(
-            status_code=500,
-            detail="TF-IDF model not loaded"
-        )
 
-    idx = get_local_IDX_BY_title(query_title)
+def _TOPK_ROWS(scores: np.ndarray, k: int) -> Tuple[np.ndarray, np.ndarray]:
+    # row-wise _TOPK_ORDER over a dense (m, n) block: (indices, scores), best first
+    k = min(k, scores.shape[1])
+    if k <= 0:
+        empty = np.empty((scores.shape[0], 0))
+        return empty.astype(np.int64), empty.astype(scores.dtype)
+
+    part = np.argpartition(-scores, k - 1, axis=1)[:, :k]
+    part_scores = np.take_along_axis(scores, part, axis=1)
+    order = np.argsort(-part_scores, axis=1, kind="stable")
+    return (
+        np.take_along_axis(part, order, axis=1),
+        np.take_along_axis(part_scores, order, axis=1),
+    )
+
 
+def Tfidf_RECOMMEND_ROWS(
+    query_title: str,
+    top_n: int = 10,
+    m: Optional["MODEL_STATE"] = None,
+    near_miss: bool = True
+) -> List[Tuple[int, float]]:
+
+    m = m or _CURRENT_MODEL()
+    idx = get_local_IDX_BY_title(query_title, m, near_miss=near_miss)
+    start = time.perf_counter()
+
+    if m.topk_indices is not None and top_n <= m.topk_indices.shape[1]:
+        nbrs = m.topk_indices[idx, :top_n]
+        nbr_scores = m.topk_scores[idx, :top_n]
+        out = [(int(i), float(sc)) for i, sc in zip(nbrs, nbr_scores)]
+        TFIDF_SCORING_SECONDS.observe(("topk",), time.perf_counter() - start)
+        return out
+
+    # rows appended by an incremental rebuild are not in the ANN index yet
+    if (TFIDF_ENGINE == "ann" and m.ann_index is not None
+            and idx < m.ann_index["ann_vectors"].shape[0]):
+        out = _ANN_RECOMMEND_ROWS(m, idx, top_n)
+        TFIDF_SCORING_SECONDS.observe(("ann",), time.perf_counter() - start)
+        return out
+
+    tfidf_matrix = m.tfidf_matrix
     qv = tfidf_matrix[idx]
     scores = (tfidf_matrix @ qv.T).toarray().ravel()
 
-    order = np.argsort(scores)[::-1]
+    order = _TOPK_ORDER(scores, top_n + 1)
 
-    out: List[Tuple[str, float]] = []
+    out: List[Tuple[int, float]] = []
 
     for i in order:
         if int(i) == int(idx):
             continue
 
-        title_i = str(df.iloc[int(i)]["title"])
-        out.append((title_i, float(scores[i])))
+        out.append((int(i), float(scores[i])))
 
         if len(out) >= top_n:
             break
 
+    TFIDF_SCORING_SECONDS.observe(("exact",), time.perf_counter() - start)
+    return out
+
+
+def _ANN_RECOMMEND_ROWS(
+    m: "MODEL_STATE",
+    idx: int,
+    top_n: int,
+    nprobe: int = ANN_NPROBE
+) -> List[Tuple[int, float]]:
+    # same search rebuild_models.py reports recall for at build time
+    rows, scores = rebuild_models.ann_search(m.ann_index, m.tfidf_matrix, idx, top_n, nprobe)
+    return [(int(i), float(sc)) for i, sc in zip(rows, scores)]
+
+
+def Tfidf_RECOMMEND_ROWS_BATCH(
+    query_titles: List[str],
+    top_n: int = 10,
+    m: Optional["MODEL_STATE"] = None
+) -> Dict[str, Tuple[List[Tuple[int, float]], Optional[str]]]:
+
+    m = m or _CURRENT_MODEL()
+
+    out: Dict[str, Tuple[List[Tuple[int, float]], Optional[str]]] = {}
+    resolved: Dict[str, int] = {}
+
+    # per-title errors are reported in place instead of failing the batch
+    for title in query_titles:
+        try:
+            resolved[title] = get_local_IDX_BY_title(title, m)
+        except HTTPException as e:
+            out[title] = ([], str(e.detail))
+
+    if not resolved:
+        return out
+
+    keys = list(resolved)
+    rows = np.fromiter((resolved[k] for k in keys), dtype=np.int64, count=len(keys))
+    t0 = time.perf_counter()
+
+    if m.topk_indices is not None and top_n <= m.topk_indices.shape[1]:
+        nbr_idx = m.topk_indices[rows, :top_n]
+        nbr_scores = m.topk_scores[rows, :top_n]
+        for key, idxs, scs in zip(keys, nbr_idx, nbr_scores):
+            out[key] = ([(int(i), float(sc)) for i, sc in zip(idxs, scs)], None)
+        TFIDF_SCORING_SECONDS.observe(("batch_topk",), time.perf_counter() - t0)
+        return out
+
+    # one sparse matrix-matrix product per block of query rows
+    tfidf_matrix = m.tfidf_matrix
+    matrix_t = tfidf_matrix.T
+    for start in range(0, len(keys), TFIDF_BATCH_BLOCK_ROWS):
+        block_rows = rows[start:start + TFIDF_BATCH_BLOCK_ROWS]
+        block = (tfidf_matrix[block_rows] @ matrix_t).toarray()
+        block[np.arange(len(block_rows)), block_rows] = -np.inf
+
+        nbr_idx, nbr_scores = _TOPK_ROWS(block, top_n)
+        for key, idxs, scs in zip(keys[start:], nbr_idx, nbr_scores):
+            out[key] = (
+                [(int(i), float(sc)) for i, sc in zip(idxs, scs) if np.isfinite(sc)],
+                None,
+            )
+
+    TFIDF_SCORING_SECONDS.observe(("batch_exact",), time.perf_counter() - t0)
+    return out
+
+
+TEXT_PREPROCESS_LOCK = threading.Lock()
+TEXT_PREPROCESS_READY: Optional[bool] = None
+
+
+def PREPROCESS_QUERY_TEXT(text: str) -> str:
+    # the matrix was fitted on stopword-filtered, lemmatized tags; queries need the
+    # same treatment or inflected words ("wizards") miss the vocabulary
+    global TEXT_PREPROCESS_READY
+    if TEXT_PREPROCESS_READY is None:
+        with TEXT_PREPROCESS_LOCK:
+            if TEXT_PREPROCESS_READY is None:
+                try:
+                    rebuild_models._init_preprocessor()
+                    TEXT_PREPROCESS_READY = True
+                except (ImportError, LookupError) as e:
+                    logger.warning("NLTK data missing, free-text queries are not lemmatized: %s", e)
+                    TEXT_PREPROCESS_READY = False
+
+    if not TEXT_PREPROCESS_READY:
+        return " ".join(text.lower().split())
+    return rebuild_models.preprocessor_text(text)
+
+
+def Tfidf_RECOMMEND_ROWS_FOR_TEXT(
+    text: str,
+    top_n: int = 10,
+    m: Optional["MODEL_STATE"] = None
+) -> List[Tuple[int, float]]:
+
+    m = m or _CURRENT_MODEL()
+    if m.tfidf_object is None:
+        raise HTTPException(
+            status_code=500,
+            detail="TF-IDF vectorizer not loaded"
+        )
+
+    # keyed on the raw text so cache hits skip the NLTK preprocessing too
+    key = " ".join(text.lower().split())
+    qv = m.text_query_cache.get(key)
+    if qv is None:
+        qv = m.tfidf_object.transform([PREPROCESS_QUERY_TEXT(key)])
+        if qv.shape[1] != m.tfidf_matrix.shape[1]:
+            raise HTTPException(
+                status_code=500,
+                detail="TF-IDF vectorizer does not match the loaded matrix"
+            )
+        m.text_query_cache.set(key, qv, float("inf"))
+
+    if qv.nnz == 0:
+        return []
+
+    t0 = time.perf_counter()
+    scores = (m.tfidf_matrix @ qv.T).toarray().ravel()
+    order = _TOPK_ORDER(scores, top_n)
+    out = [(int(i), float(scores[i])) for i in order if scores[i] > 0]
+    TFIDF_SCORING_SECONDS.observe(("text",), time.perf_counter() - t0)
+    return out
+
+
+def Tfidf_RECOMMEND_TITLES(
+    query_title: str,
+    top_n: int = 10,
+    m: Optional["MODEL_STATE"] = None
+) -> List[Tuple[str, float]]:
+    m = m or _CURRENT_MODEL()
+    rows = Tfidf_RECOMMEND_ROWS(query_title, top_n=top_n, m=m)
+    titles = m.titles.take([i for i, _ in rows])
+    return [(t, score) for t, (_, score) in zip(titles, rows)]
+
+
+def TFIDF_ITEMS_FROM_ROWS(
+    rows: List[Tuple[int, float]],
+    m: "MODEL_STATE"
+) -> List[TFIDFRECITEM]:
+    # titles gathered in one pass; cards only from the local mapping
+    titles = m.titles.take([i for i, _ in rows])
+    return [
+        TFIDFRECITEM(title=t, score=s, tmdb=m.tmdb_card_by_row.get(i))
+        for t, (i, s) in zip(titles, rows)
+    ]
+
+
+# =========================
+# Local Genre Recommendations
+# =========================
+
+def GENRE_RECOMMEND_ROWS(
+    catalog: "CATALOG_STORE",
+    genre_ids: Sequence[int],
+    limit: int,
+    exclude_rows: Sequence[int] = (),
+    eligible: Optional[np.ndarray] = None
+) -> np.ndarray:
+    lists = [catalog.postings(int(g)) for g in dict.fromkeys(genre_ids)]
+    if eligible is not None:
+        lists = [l[eligible[l]] for l in lists]
+    lists = sorted((l for l in lists if len(l)), key=len)
+    if not lists:
+        return np.zeros(0, dtype=np.int64)
+
+    exclude = np.asarray(exclude_rows, dtype=np.int64)
+
+    # movies in every genre; postings share one ordering, so filtering keeps it
+    hits = lists[0]
+    for l in lists[1:]:
+        hits = hits[np.isin(hits, l)]
+    out = hits[~np.isin(hits, exclude)][:limit]
+
+    if len(out) < limit and len(lists) > 1:
+        # then movies sharing the most genres, among the most popular of each genre
+        cand = np.concatenate([l[:GENRE_SCAN_DEPTH] for l in lists])
+        rows, shared = np.unique(cand, return_counts=True)
+        ranked = rows[np.lexsort((catalog.rank[rows], -shared))]
+        ranked = ranked[~np.isin(ranked, np.concatenate([out, exclude]))]
+        out = np.concatenate([out, ranked[:limit - len(out)]])
+
     return out
 
 
+def LOCAL_GENRE_CARDS(
+    m: "MODEL_STATE",
+    tmdb_id: int,
+    limit: int
+) -> Optional[List[TMDBMOVIES_CARD]]:
+    # None when the movie is not in the local catalog (caller falls back to TMDB)
+    row = m.row_by_tmdb_id.get(tmdb_id)
+    if row is None:
+        return None
+
+    genres = m.catalog.genres(row)
+    if len(genres) == 0:
+        return None
+
+    rows = GENRE_RECOMMEND_ROWS(
+        m.catalog, genres, limit, exclude_rows=[row], eligible=m.has_card
+    )
+    return [m.tmdb_card_by_row[int(i)] for i in rows]
+
+
+def AUTOCOMPLETE_CARDS(m: "MODEL_STATE", query: str, limit: int) -> List[TMDBMOVIES_CARD]:
+    rows = m.autocomplete.search(query, limit)
+
+    # a typo in an otherwise complete title ("intersteller")
+    if len(rows) < limit:
+        row = m.title_index.fuzzy(query)
+        if row is not None and m.has_card[row] and row not in rows:
+            rows.append(row)
+
+    return [m.tmdb_card_by_row[r] for r in rows]
+
+
 async def ATTACH_TMDB_CARD_BY_TITLE(title: str) -> Optional[TMDBMOVIES_CARD]:
     try:
         m = await TMDB_SEARCH_FIRST(title)
@@ -280,7 +1603,7 @@ async def ATTACH_TMDB_CARD_BY_TITLE(title: str) -> Optional[TMDBMOVIES_CARD]:
         return TMDBMOVIES_CARD(
             tmdb_id=int(m["id"]),
             title=m.get("title") or "",
-            poster_url=MAKE_IMAGE_URL(m.get("poster_path")),
+            poster_url=MAKE_IMAGE_URL(m.get("poster_path"), m["id"]),
             release_date=m.get("release_date"),
             vote_average=m.get("vote_average"),
         )
@@ -288,30 +1611,648 @@ async def ATTACH_TMDB_CARD_BY_TITLE(title: str) -> Optional[TMDBMOVIES_CARD]:
         return None
 
 
+async def ATTACH_TMDB_CARDS_BY_TITLES(
+    titles: List[str]
+) -> List[Optional[TMDBMOVIES_CARD]]:
+    sem = asyncio.Semaphore(CARD_LOOKUP_CONCURRENCY)
+
+    async def one(title: str) -> Optional[TMDBMOVIES_CARD]:
+        async with sem:
+            # a slow lookup only drops its own card
+            try:
+                return await asyncio.wait_for(
+                    ATTACH_TMDB_CARD_BY_TITLE(title),
+                    timeout=CARD_LOOKUP_TIMEOUT,
+                )
+            except asyncio.TimeoutError:
+                return None
+
+    return list(await asyncio.gather(*(one(t) for t in titles)))
+
+
+async def ATTACH_TMDB_CARDS_BY_ROWS(
+    rows: List[int],
+    m: "MODEL_STATE"
+) -> List[Optional[TMDBMOVIES_CARD]]:
+    # rows in the local mapping need no upstream call; only the rest hit TMDB
+    cards: List[Optional[TMDBMOVIES_CARD]] = [m.tmdb_card_by_row.get(i) for i in rows]
+    missing = [n for n, i in enumerate(rows) if i not in m.tmdb_card_by_row]
+
+    if missing:
+        fetched = await ATTACH_TMDB_CARDS_BY_TITLES(
+            m.titles.take([rows[n] for n in missing])
+        )
+        for n, card in zip(missing, fetched):
+            cards[n] = card
+
+    return cards
+
+
+def LOAD_TMDB_MAP(path: str, titles: Sequence[str]) -> Dict[int, Optional[TMDBMOVIES_CARD]]:
+    if not os.path.exists(path):
+        return {}
+
+    conn = sqlite3.connect(f"file:{path}?mode=ro", uri=True)
+    try:
+        rows = conn.execute(
+            "SELECT row_idx, title, tmdb_id, poster_path, release_date, vote_average "
+            "FROM tmdb_map"
+        ).fetchall()
+    finally:
+        conn.close()
+
+    out: Dict[int, Optional[TMDBMOVIES_CARD]] = {}
+    n = len(titles)
+
+    for row_idx, title, tmdb_id, poster_path, release_date, vote_average in rows:
+        # ignore entries left over from a different catalog build
+        if row_idx >= n or titles[row_idx] != title:
+            continue
+
+        if tmdb_id is None:
+            out[row_idx] = None
+            continue
+
+        out[row_idx] = TMDBMOVIES_CARD(
+            tmdb_id=int(tmdb_id),
+            title=title,
+            poster_url=MAKE_IMAGE_URL(poster_path, tmdb_id),
+            release_date=release_date,
+            vote_average=vote_average,
+        )
+
+    return out
+
+
+# ==================================
+# Memory-Mapped Artifacts
+# ==================================
+
+class STRING_TABLE:
+    # read-only strings stored as one utf-8 blob plus int64 offsets
+    def __init__(self, offsets: np.ndarray, blob: np.ndarray):
+        self.offsets = offsets
+        self.blob = blob
+
+    def __len__(self) -> int:
+        return len(self.offsets) - 1
+
+    def __getitem__(self, i: int) -> str:
+        start, end = self.offsets[i], self.offsets[i + 1]
+        return self.blob[start:end].tobytes().decode("utf-8")
+
+    def __iter__(self):
+        for i in range(len(self)):
+            yield self[i]
+
+    def take(self, rows: Sequence[int]) -> List[str]:
+        # one offsets gather for the whole batch instead of a lookup per row
+        rows = np.asarray(rows, dtype=np.int64)
+        starts = self.offsets[rows]
+        ends = self.offsets[rows + 1]
+        blob = self.blob
+        return [blob[a:b].tobytes().decode("utf-8") for a, b in zip(starts, ends)]
+
+
+def BUILD_STRING_TABLE(values: Sequence[str]) -> STRING_TABLE:
+    return STRING_TABLE(*rebuild_models._string_table(values))
+
+
+class CATALOG_STORE:
+    # read-only columnar catalog indexed by row: titles in a STRING_TABLE, genre ids
+    # as offsets + flat ids, vote_average and popularity as float32 arrays, plus a
+    # genre -> rows inverted index whose postings are in popularity order
+    def __init__(
+        self,
+        titles: STRING_TABLE,
+        genre_offsets: np.ndarray,
+        genre_ids: np.ndarray,
+        vote_average: np.ndarray,
+        popularity: np.ndarray,
+        genre_index: Optional[Dict[str, np.ndarray]] = None,
+    ):
+        self.titles = titles
+        self.genre_offsets = genre_offsets
+        self.genre_ids = genre_ids
+        self.vote_average = vote_average
+        self.popularity = popularity
+
+        if genre_index is None:
+            # pickles and older artifacts: same posting order rebuild_models.py writes
+            genre_index = rebuild_models.build_genre_index({
+                "genre_offsets": genre_offsets,
+                "genre_ids": genre_ids,
+                "vote_average": vote_average,
+                "popularity": popularity,
+            })
+        self.genre_index_ids = genre_index["genre_index_ids"]
+        self.genre_index_offsets = genre_index["genre_index_offsets"]
+        self.genre_index_rows = genre_index["genre_index_rows"]
+
+        # row -> position in the popularity / vote_average ordering
+        self.rank = rebuild_models.popularity_rank(vote_average, popularity)
+
+    def __len__(self) -> int:
+        return len(self.titles)
+
+    def genres(self, row: int) -> np.ndarray:
+        return self.genre_ids[self.genre_offsets[row]:self.genre_offsets[row + 1]]
+
+    def postings(self, genre_id: int) -> np.ndarray:
+        pos = int(np.searchsorted(self.genre_index_ids, genre_id))
+        if pos >= len(self.genre_index_ids) or self.genre_index_ids[pos] != genre_id:
+            return np.zeros(0, dtype=np.int64)
+        start, end = self.genre_index_offsets[pos], self.genre_index_offsets[pos + 1]
+        return self.genre_index_rows[start:end]
+
+
+def BUILD_CATALOG_FROM_FRAME(df: pd.DataFrame) -> CATALOG_STORE:
+    # genre parsing and column dtypes are shared with the artifact writer
+    cols = rebuild_models.catalog_columns(df)
+    return CATALOG_STORE(
+        titles=BUILD_STRING_TABLE(df["title"].astype(str).tolist()),
+        genre_offsets=cols["genre_offsets"],
+        genre_ids=cols["genre_ids"],
+        vote_average=cols["vote_average"],
+        popularity=cols["popularity"],
+    )
+
+
+def BUILD_CATALOG_FROM_ARTIFACTS(loaded: Dict[str, Any]) -> CATALOG_STORE:
+    titles = loaded["titles"]
+    if not isinstance(titles, STRING_TABLE):
+        titles = BUILD_STRING_TABLE(titles)
+
+    # builds from before the catalog columns existed: no genres, zero scores
+    arrays = loaded["arrays"]
+    n = len(titles)
+    if "genre_offsets" not in arrays:
+        return CATALOG_STORE(
+            titles,
+            np.zeros(n + 1, dtype=np.int64),
+            np.zeros(0, dtype=np.int32),
+            np.zeros(n, dtype=np.float32),
+            np.zeros(n, dtype=np.float32),
+        )
+
+    genre_index = None
+    if "genre_index_rows" in arrays:
+        genre_index = {k: arrays[k] for k in
+                       ("genre_index_ids", "genre_index_offsets", "genre_index_rows")}
+
+    return CATALOG_STORE(
+        titles,
+        arrays["genre_offsets"],
+        arrays["genre_ids"],
+        arrays["vote_average"],
+        arrays["popularity"],
+        genre_index,
+    )
+
+
+def LOAD_MMAP_ARTIFACTS(artifacts_dir: str) -> Dict[str, Any]:
+    with open(os.path.join(artifacts_dir, "manifest.json")) as f:
+        manifest = json.load(f)
+
+    if manifest.get("format_version") != ARTIFACTS_FORMAT_VERSION:
+        raise RuntimeError(
+            f"Unsupported artifacts format {manifest.get('format_version')!r}"
+        )
+
+    arrays: Dict[str, np.ndarray] = {}
+    for name, meta in manifest["files"].items():
+        arr = np.load(os.path.join(artifacts_dir, meta["file"]), mmap_mode="r")
+        if list(arr.shape) != meta["shape"]:
+            raise RuntimeError(f"artifact {meta['file']} does not match manifest")
+        arrays[name] = arr
+
+    n_rows, n_features = manifest["n_rows"], manifest["n_features"]
+
+    # copy=False keeps the CSR arrays backed by the shared read-only mappings
+    matrix = sparse.csr_matrix(
+        (arrays["tfidf_data"], arrays["tfidf_indices"], arrays["tfidf_indptr"]),
+        shape=(n_rows, n_features),
+        copy=False,
+    )
+
+    return {
+        "manifest": manifest,
+        "arrays": arrays,
+        "tfidf_matrix": matrix,
+        "titles": STRING_TABLE(arrays["title_offsets"], arrays["title_blob"]),
+        "vocab": STRING_TABLE(arrays["vocab_offsets"], arrays["vocab_blob"]),
+    }
+
+
+def APPLY_DELTA_ARTIFACTS(loaded: Dict[str, Any], delta_dir: str) -> bool:
+    # overlay rows from an incremental rebuild onto the mapped base build
+    manifest_path = os.path.join(delta_dir, "manifest.json")
+    if not os.path.exists(manifest_path):
+        return False
+
+    with open(manifest_path) as f:
+        delta_manifest = json.load(f)
+
+    if delta_manifest.get("base_build_id") != loaded["manifest"].get("build_id"):
+        logger.warning("Ignoring delta artifacts built against a different base")
+        return False
+
+    arrays = {
+        name: np.load(os.path.join(delta_dir, meta["file"]), mmap_mode="r")
+        for name, meta in delta_manifest["files"].items()
+    }
+
+    rows = np.asarray(arrays["delta_rows"])
+    n_total = delta_manifest["n_rows"]
+    base = loaded["tfidf_matrix"]
+    delta = sparse.csr_matrix(
+        (arrays["delta_data"], arrays["delta_indices"], arrays["delta_indptr"]),
+        shape=(len(rows), base.shape[1]),
+        copy=False,
+    )
+
+    # the merged matrix is a private copy; the next full rebuild restores sharing
+    stacked = sparse.vstack([base, delta]).tocsr()
+    perm = np.arange(n_total)
+    perm[rows] = base.shape[0] + np.arange(len(rows))
+    loaded["tfidf_matrix"] = stacked[perm]
+
+    titles = list(loaded["titles"]) + [""] * (n_total - len(loaded["titles"]))
+    delta_titles = STRING_TABLE(arrays["delta_title_offsets"], arrays["delta_title_blob"])
+    for row, title in zip(rows, delta_titles):
+        titles[int(row)] = title
+    loaded["titles"] = titles
+
+    # top-K, the catalog columns and the genre index are carried whole
+    for name in ("topk_indices", "topk_scores", "genre_offsets", "genre_ids",
+                 "vote_average", "popularity", "genre_index_ids",
+                 "genre_index_offsets", "genre_index_rows"):
+        if name in arrays:
+            loaded["arrays"][name] = arrays[name]
+
+    return True
+
+
+class HASHED_TFIDF_VECTORIZER:
+    # transform() counterpart of a streaming build: hashed term counts * idf, normalized
+    def __init__(self, params: Dict[str, Any], idf: np.ndarray):
+        from sklearn.feature_extraction.text import HashingVectorizer
+
+        self.norm = params.pop("norm", "l2")
+        self.hasher = HashingVectorizer(norm=None, **params)
+        self.idf = idf
+
+    def transform(self, texts: List[str]) -> Any:
+        from sklearn.preprocessing import normalize
+
+        counts = sparse.csr_matrix(self.hasher.transform(texts).multiply(self.idf))
+        return normalize(counts, norm=self.norm) if self.norm else counts
+
+
+def BUILD_VECTORIZER_FROM_ARTIFACTS(loaded: Dict[str, Any]) -> Any:
+    from sklearn.feature_extraction.text import TfidfVectorizer
+
+    params = dict(loaded["manifest"].get("vectorizer") or {})
+    if params.pop("kind", "tfidf") == "hashing":
+        return HASHED_TFIDF_VECTORIZER(params, np.asarray(loaded["arrays"]["idf"]))
+
+    if isinstance(params.get("ngram_range"), list):
+        params["ngram_range"] = tuple(params["ngram_range"])
+
+    vec = TfidfVectorizer(**params)
+    vec.vocabulary_ = {term: i for i, term in enumerate(loaded["vocab"])}
+    vec.idf_ = np.asarray(loaded["arrays"]["idf"])
+    return vec
+
+
+# ==================================
+# Model State + Hot Reload
+# ==================================
+
+class MODEL_STATE:
+    # everything built from one artifact version; requests hold a reference
+    # for their whole lifetime, so a reload never mixes old and new data
+    def __init__(
+        self,
+        version: str,
+        catalog: CATALOG_STORE,
+        tfidf_matrix: Any,
+        tfidf_object: Any,
+        title_to_index: Dict[str, int],
+        topk_indices: Optional[np.ndarray] = None,
+        topk_scores: Optional[np.ndarray] = None,
+        ann_index: Optional[Dict[str, np.ndarray]] = None,
+        ann_meta: Optional[Dict[str, Any]] = None,
+    ):
+        self.version = version
+        # columnar catalog; df.pkl is dropped after this is built
+        self.catalog = catalog
+        self.titles = catalog.titles
+        self.tfidf_matrix = tfidf_matrix
+        self.tfidf_object = tfidf_object
+        self.title_to_index = title_to_index
+
+        # precomputed neighbour table from rebuild_models.py (optional)
+        if topk_indices is not None and topk_indices.shape[0] != tfidf_matrix.shape[0]:
+            topk_indices = topk_scores = None
+        self.topk_indices = topk_indices
+        self.topk_scores = topk_scores
+
+        # optional ANN engine arrays (ann_vectors, ann_centroids, ann_list_offsets,
+        # ann_list_members) and its build metadata from the manifest
+        self.ann_index = ann_index
+        self.ann_meta = ann_meta or {}
+
+        # title search indexes are built on first use (near-miss lookups and
+        # /autocomplete), so a reload doesn't pay for them up front
+        self._search_lock = threading.Lock()
+        self._title_index: Optional[TITLE_SEARCH_INDEX] = None
+        self._autocomplete: Optional[AUTOCOMPLETE_INDEX] = None
+
+        # catalog row -> TMDB card from tmdb_map.sqlite (None = known to have no TMDB match)
+        self.tmdb_card_by_row = LOAD_TMDB_MAP(TMDB_MAP_PATH, self.titles)
+        self.row_by_tmdb_id: Dict[int, int] = {}
+        self.has_card = np.zeros(len(catalog), dtype=bool)
+        for row, card in self.tmdb_card_by_row.items():
+            if card is not None:
+                self.row_by_tmdb_id.setdefault(card.tmdb_id, row)
+                self.has_card[row] = True
+
+        # normalized query text -> sparse (1, n_features) row for this version's vectorizer
+        self.text_query_cache = TTL_LRU_CACHE(TEXT_QUERY_CACHE_SIZE)
+
+    @property
+    def title_index(self) -> TITLE_SEARCH_INDEX:
+        if self._title_index is None:
+            with self._search_lock:
+                if self._title_index is None:
+                    self._title_index = TITLE_SEARCH_INDEX(self.title_to_index)
+        return self._title_index
+
+    @property
+    def autocomplete(self) -> AUTOCOMPLETE_INDEX:
+        # search-as-you-type over titles that have a card to show
+        if self._autocomplete is None:
+            with self._search_lock:
+                if self._autocomplete is None:
+                    eligible = np.flatnonzero(self.has_card)
+                    self._autocomplete = AUTOCOMPLETE_INDEX(
+                        self.catalog.titles.take(eligible), eligible, self.catalog.rank
+                    )
+        return self._autocomplete
+
+    @property
+    def search_indexes_built(self) -> bool:
+        return self._title_index is not None and self._autocomplete is not None
+
+
+def RESOLVE_ARTIFACTS_DIR() -> Optional[str]:
+    if os.path.exists(ARTIFACTS_CURRENT_PATH):
+        with open(ARTIFACTS_CURRENT_PATH) as f:
+            version_dir = os.path.join(ARTIFACTS_DIR, "versions", f.read().strip())
+        if os.path.exists(os.path.join(version_dir, "manifest.json")):
+            return version_dir
+
+    if os.path.exists(os.path.join(ARTIFACTS_DIR, "manifest.json")):
+        return ARTIFACTS_DIR
+
+    return None
+
+
+def ARTIFACTS_FINGERPRINT() -> str:
+    # changes whenever a rebuild publishes something the API should pick up
+    artifacts_dir = RESOLVE_ARTIFACTS_DIR()
+    if artifacts_dir is not None:
+        paths = [
+            os.path.join(artifacts_dir, "manifest.json"),
+            os.path.join(artifacts_dir, "delta", "manifest.json"),
+        ]
+    else:
+        paths = [DF_PATH, INDICES_PATH, TFIDF_MATRIX_PATH, TFIDF_OBJECT_PATH, TFIDF_TOPK_PATH]
+
+    parts = [str(artifacts_dir)]
+    for path in paths + [TMDB_MAP_PATH]:
+        parts.append(str(os.path.getmtime(path)) if os.path.exists(path) else "-")
+    return "|".join(parts)
+
+
+def BUILD_MODEL_STATE() -> MODEL_STATE:
+    artifacts_dir = RESOLVE_ARTIFACTS_DIR()
+
+    if artifacts_dir is not None:
+        loaded = LOAD_MMAP_ARTIFACTS(artifacts_dir)
+        has_delta = APPLY_DELTA_ARTIFACTS(loaded, os.path.join(artifacts_dir, "delta"))
+
+        catalog = BUILD_CATALOG_FROM_ARTIFACTS(loaded)
+        arrays = loaded["arrays"]
+        ann_index = None
+        if "ann_vectors" in arrays:
+            ann_index = {k: v for k, v in arrays.items() if k.startswith("ann_")}
+
+        version = str(loaded["manifest"].get("build_id", "flat"))
+        state = MODEL_STATE(
+            version=version + ("+delta" if has_delta else ""),
+            catalog=catalog,
+            tfidf_matrix=loaded["tfidf_matrix"],
+            tfidf_object=BUILD_VECTORIZER_FROM_ARTIFACTS(loaded),
+            title_to_index={_norm_TITLE(t): i for i, t in enumerate(catalog.titles)},
+            topk_indices=arrays.get("topk_indices"),
+            topk_scores=arrays.get("topk_scores"),
+            ann_index=ann_index,
+            ann_meta=dict(loaded["manifest"].get("ann") or {}),
+        )
+    else:
+        with open(DF_PATH, "rb") as f:
+            df = pickle.load(f)
+
+        with open(INDICES_PATH, "rb") as f:
+            indices_obj = pickle.load(f)
+
+        with open(TFIDF_MATRIX_PATH, "rb") as f:
+            tfidf_matrix = pickle.load(f)
+
+        with open(TFIDF_OBJECT_PATH, "rb") as f:
+            tfidf_object = pickle.load(f)
+
+        if df is None or "title" not in df.columns:
+            raise RuntimeError("df.pkl must contain 'title' column")
+
+        # the neighbour table is optional; without it every request takes the live path
+        topk_indices = topk_scores = None
+        if os.path.exists(TFIDF_TOPK_PATH):
+            with np.load(TFIDF_TOPK_PATH) as topk:
+                topk_indices = topk["indices"]
+                topk_scores = topk["scores"]
+
+        state = MODEL_STATE(
+            version=f"pickle@{int(os.path.getmtime(TFIDF_MATRIX_PATH))}",
+            catalog=BUILD_CATALOG_FROM_FRAME(df),
+            tfidf_matrix=tfidf_matrix,
+            tfidf_object=tfidf_object,
+            title_to_index=Build_TITLE_TO_INDEX_MAP(indices_obj),
+            topk_indices=topk_indices,
+            topk_scores=topk_scores,
+        )
+
+    if TFIDF_ENGINE == "ann" and state.ann_index is None:
+        logger.warning("TFIDF_ENGINE=ann but no ANN index in artifacts/; using exact scoring")
+
+    return state
+
+
+async def RELOAD_MODEL(force: bool = False) -> bool:
+    global MODEL, MODEL_FINGERPRINT, RELOAD_LOCK
+
+    if RELOAD_LOCK is None:
+        RELOAD_LOCK = asyncio.Lock()
+
+    async with RELOAD_LOCK:
+        fingerprint = ARTIFACTS_FINGERPRINT()
+        if not force and fingerprint == MODEL_FINGERPRINT:
+            return False
+
+        # build off the event loop; requests keep being served by the old MODEL
+        new_model = await asyncio.to_thread(BUILD_MODEL_STATE)
+
+        # single reference swap: new requests see the new version, in-flight ones
+        # finish on the state they already hold
+        MODEL = new_model
+        MODEL_FINGERPRINT = fingerprint
+        logger.info("Loaded model version %s", new_model.version)
+        return True
+
+
+async def WATCH_ARTIFACTS():
+    while True:
+        await asyncio.sleep(ARTIFACTS_WATCH_INTERVAL)
+        try:
+            await RELOAD_MODEL()
+        except Exception:
+            logger.exception("Artifact reload failed; keeping the current version")
+
+
 # ==================================
 # Startup: LOAD PICKLES
 # ==================================
 
 @app.on_event("startup")
 def load_pickle():
-    global df, indices_obj, tfidf_matrix, tfidf_object, TITLE_TO_INDEX
+    global MODEL, MODEL_FINGERPRINT
+
+    MODEL_FINGERPRINT = ARTIFACTS_FINGERPRINT()
+    MODEL = BUILD_MODEL_STATE()
+
+
+@app.on_event("startup")
+async def start_artifacts_watcher():
+    global ARTIFACTS_WATCH_TASK
+    if ARTIFACTS_WATCH_INTERVAL > 0:
+        ARTIFACTS_WATCH_TASK = asyncio.ensure_future(WATCH_ARTIFACTS())
+
+
+@app.on_event("shutdown")
+async def stop_artifacts_watcher():
+    global ARTIFACTS_WATCH_TASK
+    if ARTIFACTS_WATCH_TASK is not None:
+        ARTIFACTS_WATCH_TASK.cancel()
+        ARTIFACTS_WATCH_TASK = None
 
-    with open(DF_PATH, "rb") as f:
-        df = pickle.load(f)
 
-    with open(INDICES_PATH, "rb") as f:
-        indices_obj = pickle.load(f)
+@app.on_event("startup")
+async def start_home_refresh():
+    # first fetches run in the background so startup never waits on TMDB
+    if HOME_REFRESH_INTERVAL > 0:
+        for category in HOME_CATEGORIES:
+            HOME_REFRESH_TASKS.append(asyncio.ensure_future(HOME_REFRESH_LOOP(category)))
+
 
-    with open(TFIDF_MATRIX_PATH, "rb") as f:
-        tfidf_matrix = pickle.load(f)
+@app.on_event("shutdown")
+async def stop_home_refresh():
+    for task in HOME_REFRESH_TASKS:
+        task.cancel()
+    HOME_REFRESH_TASKS.clear()
 
-    with open(TFIDF_OBJECT_PATH, "rb") as f:
-        tfidf_object = pickle.load(f)
 
-    TITLE_TO_INDEX = Build_TITLE_TO_INDEX_MAP(indices_obj)
+# ==================================
+# Startup/Shutdown: TMDB CLIENT
+# ==================================
+
+@app.on_event("startup")
+async def open_tmdb_client():
+    global TMDB_CLIENT
+    TMDB_CLIENT = BUILD_TMDB_CLIENT()
+
 
-    if df is None or "title" not in df.columns:
-        raise RuntimeError("df.pkl must contain 'title' column")
+@app.on_event("shutdown")
+async def close_tmdb_client():
+    global TMDB_CLIENT
+    if TMDB_CLIENT is not None:
+        await TMDB_CLIENT.aclose()
+        TMDB_CLIENT = None
+
+
+# ==================================
+# Movie Bundle
+# ==================================
+
+async def BUILD_MOVIE_BUNDLE(
+    query: str,
+    tmdb_id: int,
+    details_task: "asyncio.Future[TMDBMOVIESDETAILS]",
+    m: "MODEL_STATE",
+    tfidf_top_n: int,
+    genre_limits: int
+) -> SEARCHBUNDLERESPONSE:
+    # a catalog movie has its title and genres locally, so TF-IDF and genre
+    # recommendations start without waiting for the details call
+    row = m.row_by_tmdb_id.get(tmdb_id)
+
+    async def tfidf_items() -> List[TFIDFRECITEM]:
+        title = m.titles[row] if row is not None else (await details_task).title
+        try:
+            # a TMDB movie outside the catalog gets no TF-IDF list, not a lookalike's
+            recs = await asyncio.to_thread(
+                Tfidf_RECOMMEND_ROWS, title, tfidf_top_n, m, near_miss=False
+            )
+        except Exception:
+            return []
+
+        cards = await ATTACH_TMDB_CARDS_BY_ROWS([i for i, _ in recs], m)
+        titles = m.titles.take([i for i, _ in recs])
+        return [
+            TFIDFRECITEM(title=t, score=score, tmdb=card)
+            for t, (_, score), card in zip(titles, recs, cards)
+        ]
+
+    async def genre_recs() -> List[TMDBMOVIES_CARD]:
+        local = LOCAL_GENRE_CARDS(m, tmdb_id, genre_limits)
+        if local is not None:
+            return local
+
+        details = await details_task
+        if not details.genres:
+            return []
+        genre_id = details.genres[0]["id"]
+        return await TMDB_GENRE_CARDS(genre_id, genre_limits, exclude_tmdb_id=tmdb_id)
+
+    tasks = [
+        details_task,
+        asyncio.ensure_future(tfidf_items()),
+        asyncio.ensure_future(genre_recs()),
+    ]
+    try:
+        details, tfidf_rec, genre_rec = await asyncio.gather(*tasks)
+    finally:
+        for task in tasks:
+            if not task.done():
+                task.cancel()
+
+    return SEARCHBUNDLERESPONSE(
+        query=query,
+        movies_details=details,
+        TFIDF_RECOMMENDATIONS=tfidf_rec,
+        GENRE_RECOMMENDATIONS=genre_rec,
+    )
 
 
 # ============================
@@ -320,7 +2261,79 @@ def load_pickle():
 
 @app.get("/health")
 async def health():
-    return {"status": "ok"}
+    return {
+        "status": "ok",
+        "model_version": MODEL.version if MODEL is not None else None,
+    }
+
+
+@app.get("/metrics", response_class=PlainTextResponse)
+async def metrics():
+    # Prometheus text exposition format; values are per worker process
+    lines: List[str] = []
+    for metric in (HTTP_REQUEST_SECONDS, TMDB_REQUEST_SECONDS,
+                   TMDB_REQUEST_ERRORS, TFIDF_SCORING_SECONDS):
+        lines.extend(metric.render())
+
+    lines += [
+        "# HELP http_requests_in_flight Requests currently being served",
+        "# TYPE http_requests_in_flight gauge",
+        f"http_requests_in_flight {HTTP_IN_FLIGHT}",
+        "# HELP tmdb_requests_in_flight Upstream TMDB calls currently in flight",
+        "# TYPE tmdb_requests_in_flight gauge",
+        f"tmdb_requests_in_flight {TMDB_IN_FLIGHT}",
+    ]
+
+    caches = {"tmdb_response": TMDB_RESPONSE_CACHE, "poster": POSTER_CACHE}
+    if MODEL is not None:
+        caches["text_query"] = MODEL.text_query_cache
+
+    for metric, kind, help_text, value in (
+        ("cache_hits_total", "counter", "Cache hits", lambda c: c.hits),
+        ("cache_misses_total", "counter", "Cache misses (including expired entries)", lambda c: c.misses),
+        ("cache_entries", "gauge", "Entries currently cached", len),
+        ("cache_hit_ratio", "gauge", "hits / (hits + misses) since start or reload",
+         lambda c: c.hits / (c.hits + c.misses) if c.hits + c.misses else 0.0),
+    ):
+        lines.append(f"# HELP {metric} {help_text}")
+        lines.append(f"# TYPE {metric} {kind}")
+        for name, cache in caches.items():
+            lines.append(f'{metric}{{cache="{name}"}} {value(cache)}')
+
+    if MODEL is not None:
+        lines += [
+            "# HELP model_info Loaded recommendation model version",
+            "# TYPE model_info gauge",
+            f'model_info{{version="{MODEL.version}"}} 1',
+        ]
+
+    return PlainTextResponse("\n".join(lines) + "\n", media_type="text/plain; version=0.0.4")
+
+
+def _CHECK_ADMIN_TOKEN(x_admin_token: Optional[str]) -> None:
+    if not ADMIN_TOKEN:
+        raise HTTPException(status_code=403, detail="Admin endpoints are disabled; set ADMIN_TOKEN")
+    if not hmac.compare_digest((x_admin_token or "").encode(), ADMIN_TOKEN.encode()):
+        raise HTTPException(status_code=403, detail="Invalid admin token")
+
+
+@app.post("/admin/reload")
+async def admin_reload(
+    force: bool = Query(False),
+    x_admin_token: Optional[str] = Header(None),
+):
+    # a forced reload rebuilds every index, so it is never open to anonymous callers
+    _CHECK_ADMIN_TOKEN(x_admin_token)
+
+    try:
+        reloaded = await RELOAD_MODEL(force=force)
+    except Exception as e:
+        raise HTTPException(
+            status_code=500,
+            detail=f"Reload failed, still serving the previous version: {repr(e)}"
+        )
+
+    return {"reloaded": reloaded, "model_version": MODEL.version}
 
 
 # ======================================
@@ -329,19 +2342,46 @@ async def health():
 
 @app.get("/home", response_model=List[TMDBMOVIES_CARD])
 async def home_feed(
+    response: Response,
     category: str = Query("popular", min_length=1),
-    limit: int = Query(20, ge=2, le=50),
+    limit: int = Query(20, ge=2, le=100),
+    cursor: Optional[str] = Query(None),
 ):
     category = category.lower()
-    if category == "trending":
-        data = await TMDB_get("/trending/movie/day", {"language": "en-us"})
-        return await TMDB_CARD_FROM_RESULT(data.get("results", []), limit)
-
-    if category not in {"popular", "top_rated", "upcoming", "now_playing"}:
+    if category not in HOME_CATEGORIES:
         raise HTTPException(status_code=400, detail="Invalid Category")
 
-    data = await TMDB_get(f"/movie/{category}", {"language": "en-us", "page": 1})
-    return await TMDB_CARD_FROM_RESULT(data.get("results", []), limit)
+    # the window may span several TMDB pages; they are fetched concurrently
+    first_page, offset = DECODE_HOME_CURSOR(cursor) if cursor else (1, 0)
+    last_page = min(HOME_MAX_PAGE, first_page + (offset + limit - 1) // HOME_PAGE_SIZE)
+    pages = await asyncio.gather(
+        *(HOME_PAGE(category, p) for p in range(first_page, last_page + 1))
+    )
+
+    # TMDB lists shift while being paged, so neighbouring pages can overlap
+    items: List[TMDBMOVIES_CARD] = []
+    seen = set()
+    next_pos: Optional[Tuple[int, int]] = None
+    for page, (cards, _) in zip(range(first_page, last_page + 1), pages):
+        start = offset if page == first_page else 0
+        for i in range(start, len(cards)):
+            if len(items) >= limit:
+                next_pos = (page, i)
+                break
+            if cards[i].tmdb_id not in seen:
+                seen.add(cards[i].tmdb_id)
+                items.append(cards[i])
+        if next_pos is not None:
+            break
+
+    total_pages = min(HOME_MAX_PAGE, max(total for _, total in pages))
+    if next_pos is None and last_page < total_pages:
+        next_pos = (last_page + 1, 0)
+
+    # the body stays a plain card list; the cursor for the next window is a header
+    if next_pos is not None:
+        response.headers["X-Next-Cursor"] = ENCODE_HOME_CURSOR(*next_pos)
+    return items
 
 
 @app.get("/tmdb/search")
@@ -352,43 +2392,143 @@ async def tmdb_search(
     return await TMDB_SEARCH_MOVIES(query=query, page=page)
 
 
+@app.get("/autocomplete", response_model=List[TMDBMOVIES_CARD])
+async def autocomplete(
+    query: str = Query(..., min_length=1),
+    limit: int = Query(10, ge=1, le=AUTOCOMPLETE_MAX_LIMIT),
+):
+    # served from memory; TMDB only when the catalog has too few matches
+    m = _CURRENT_MODEL()
+    if m.search_indexes_built:
+        cards = AUTOCOMPLETE_CARDS(m, query, limit)
+    else:
+        # the first call after a (re)load builds the indexes off the event loop
+        cards = await asyncio.to_thread(AUTOCOMPLETE_CARDS, m, query, limit)
+    if len(cards) >= min(limit, AUTOCOMPLETE_MIN_LOCAL_HITS):
+        return cards
+
+    try:
+        data = await TMDB_SEARCH_MOVIES(query=query)
+    except HTTPException as e:
+        logger.warning("TMDB search for autocomplete failed: %s", e.detail)
+        return cards
+
+    seen = {c.tmdb_id for c in cards}
+    for card in await TMDB_CARD_FROM_RESULT(data.get("results", []), limit=2 * limit):
+        if len(cards) >= limit:
+            break
+        if card.tmdb_id not in seen:
+            seen.add(card.tmdb_id)
+            cards.append(card)
+    return cards
+
+
 @app.get("/movie/id/{tmdb_id}", response_model=TMDBMOVIESDETAILS)
 async def movie_details_routes(tmdb_id: int):
     return await TMDB_MOVIE_DETAILS(movie_id=tmdb_id)
 
 
+@app.get("/poster/{tmdb_id}")
+async def poster_thumb(
+    tmdb_id: int,
+    w: int = Query(POSTER_THUMB_WIDTH, ge=32, le=780),
+    if_none_match: Optional[str] = Header(None),
+):
+    data = await GET_POSTER_THUMB(tmdb_id, w)
+
+    etag = '"' + hashlib.blake2b(data, digest_size=16).hexdigest() + '"'
+    headers = {
+        "ETag": etag,
+        "Cache-Control": f"public, max-age={POSTER_MAX_AGE}",
+    }
+    if if_none_match and _ETAG_MATCHES(if_none_match, etag):
+        return Response(status_code=304, headers=headers)
+
+    return Response(content=data, media_type="image/jpeg", headers=headers)
+
+
 @app.get("/recommend/genre", response_model=List[TMDBMOVIES_CARD])
 async def recommend_genre(
     tmdb_id: int = Query(...),
     limit: int = Query(10, ge=1, le=50),
 ):
+    # answered from the local genre index when the movie is in the catalog
+    m = MODEL
+    local = LOCAL_GENRE_CARDS(m, tmdb_id, limit) if m is not None else None
+    if local is not None:
+        return local
+
     details = await TMDB_MOVIE_DETAILS(movie_id=tmdb_id)
     if not details.genres:
         return []
 
     genre_id = details.genres[0]["id"]
-
-    discover = await TMDB_get(
-        "/discover/movie",
-        {
-            "with_genres": genre_id,
-            "language": "en-us",
-            "sort_by": "popularity.desc",
-            "page": 1,
-        }
-    )
-
-    cards = await TMDB_CARD_FROM_RESULT(discover.get("results", []), limit)
-    return [c for c in cards if c.tmdb_id != tmdb_id]
+    return await TMDB_GENRE_CARDS(genre_id, limit, exclude_tmdb_id=tmdb_id)
 
 
-@app.get("/recommend/tfidf")
+@app.get("/recommend/tfidf", response_model=List[TFIDFRECITEM])
 async def recommend_tfidf(
     title: str = Query(..., min_length=1),
     top_n: int = Query(10, ge=1, le=50),
 ):
-    recs = Tfidf_RECOMMEND_TITLES(title, top_n=top_n)
-    return [{"title": t, "score": s} for t, s in recs]
+    # cards come only from the local mapping; this route never calls TMDB
+    m = _CURRENT_MODEL()
+    recs = Tfidf_RECOMMEND_ROWS(title, top_n=top_n, m=m)
+    return TFIDF_ITEMS_FROM_ROWS(recs, m)
+
+
+@app.get("/recommend/text", response_model=List[TFIDFRECITEM])
+async def recommend_text(
+    query: str = Query(..., min_length=1, max_length=2000),
+    top_n: int = Query(10, ge=1, le=50),
+):
+    m = _CURRENT_MODEL()
+    recs = await asyncio.to_thread(Tfidf_RECOMMEND_ROWS_FOR_TEXT, query, top_n, m)
+    return TFIDF_ITEMS_FROM_ROWS(recs, m)
+
+
+@app.post("/recommend/tfidf/batch", response_model=TFIDFBATCHRESPONSE)
+async def recommend_tfidf_batch(body: TFIDFBATCHREQUEST):
+    m = _CURRENT_MODEL()
+    recs = await asyncio.to_thread(
+        Tfidf_RECOMMEND_ROWS_BATCH, body.titles, body.top_n, m
+    )
+
+    return TFIDFBATCHRESPONSE(
+        results={
+            title: TFIDFBATCHRESULT(
+                items=TFIDF_ITEMS_FROM_ROWS(rows, m),
+                error=err,
+            )
+            for title, (rows, err) in recs.items()
+        }
+    )
+
+
+@app.get("/recommend/tfidf/ann/recall")
+async def recommend_tfidf_ann_recall(
+    k: int = Query(10, ge=1, le=50),
+    sample: int = Query(50, ge=1, le=1000),
+    x_admin_token: Optional[str] = Header(None),
+):
+    # each sampled query scores the whole matrix, so this stays behind ADMIN_TOKEN
+    _CHECK_ADMIN_TOKEN(x_admin_token)
+
+    m = _CURRENT_MODEL()
+    if m.ann_index is None:
+        raise HTTPException(status_code=404, detail="ANN index not loaded")
+
+    recall = await asyncio.to_thread(
+        rebuild_models.ann_recall, m.ann_index, m.tfidf_matrix, k, sample, ANN_NPROBE
+    )
+    return {
+        "engine": TFIDF_ENGINE,
+        "k": k,
+        "sample": sample,
+        "nprobe": ANN_NPROBE,
+        "recall": recall,
+        "build": m.ann_meta,
+    }
 
 
 @app.get("/movie/search", response_model=SEARCHBUNDLERESPONSE)
@@ -405,44 +2545,24 @@ async def Search_bundle(
         )
 
     tmdb_id = int(best_movies["id"])
-    details = await TMDB_MOVIE_DETAILS(movie_id=tmdb_id)
-
-    tfidf_items: List[TFIDFRECITEM] = []
-
-    try:
-        recs = Tfidf_RECOMMEND_TITLES(details.title, top_n=tfidf_top_n)
-    except Exception:
-        recs = []
-
-    for title, score in recs:
-        card = await ATTACH_TMDB_CARD_BY_TITLE(title)
-        tfidf_items.append(
-            TFIDFRECITEM(title=title, score=score, tmdb=card)
-        )
-
-    genre_rec: List[TMDBMOVIES_CARD] = []
-    if details.genres:
-        genre_id = details.genres[0]["id"]
-        discover = await TMDB_get(
-            "/discover/movie",
-            {
-                "with_genres": genre_id,
-                "language": "en-us",
-                "sort_by": "popularity.desc",
-                "page": 1,
-            }
-        )
-
-        cards = await TMDB_CARD_FROM_RESULT(
-            discover.get("results", []),
-            limit=genre_limits
-        )
+    m = _CURRENT_MODEL()
+    details_task = asyncio.ensure_future(TMDB_MOVIE_DETAILS(movie_id=tmdb_id))
+    return await BUILD_MOVIE_BUNDLE(
+        query, tmdb_id, details_task, m, tfidf_top_n, genre_limits
+    )
 
-        genre_rec = [c for c in cards if c.tmdb_id != details.tmdb_id]
 
-    return SEARCHBUNDLERESPONSE(
-        query=query,
-        movies_details=details,
-        TFIDF_RECOMMENDATIONS=tfidf_items,
-        GENRE_RECOMMENDATIONS=genre_rec,
+@app.get("/movie/{tmdb_id}/bundle", response_model=SEARCHBUNDLERESPONSE)
+async def movie_bundle(
+    tmdb_id: int,
+    tfidf_top_n: int = Query(12, ge=1, le=35),
+    genre_limits: int = Query(12, ge=1, le=35),
+):
+    # details page in one round trip: no title search, details fetched once
+    m = _CURRENT_MODEL()
+    details_task = asyncio.ensure_future(TMDB_MOVIE_DETAILS(movie_id=tmdb_id))
+    bundle = await BUILD_MOVIE_BUNDLE(
+        "", tmdb_id, details_task, m, tfidf_top_n, genre_limits
     )
+    bundle.query = bundle.movies_details.title
+    return bundle
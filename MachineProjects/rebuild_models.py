@@ -1,17 +1,518 @@
+import argparse
+import ast
+import asyncio
+import hashlib
+import json
+import re
+import shutil
+import sqlite3
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
 import pandas as pd
 import pickle
+from scipy import sparse
 from sklearn.feature_extraction.text import TfidfVectorizer
+from sklearn.preprocessing import normalize
 import os
+import uuid
+
+
+# Number of neighbours kept per movie in the precomputed top-K table.
+# /recommend/tfidf caps top_n at 50, so K=50 answers every request from the table.
+TOPK_NEIGHBORS = 50
+# Rows scored per block while building the table (bounds the dense block to
+# TOPK_BLOCK_ROWS x n_movies float32).
+TOPK_BLOCK_ROWS = 512
+
+
+def _topk_block(block, k):
+    part = np.argpartition(-block, k - 1, axis=1)[:, :k]
+    part_scores = np.take_along_axis(block, part, axis=1)
+    order = np.argsort(-part_scores, axis=1, kind="stable")
+    return np.take_along_axis(part, order, axis=1), np.take_along_axis(part_scores, order, axis=1)
+
+
+def build_topk_neighbors(tfidf_matrix, k=TOPK_NEIGHBORS, block_rows=TOPK_BLOCK_ROWS, rows=None):
+    # top-k neighbours of `rows` (default: every row) against the whole matrix
+    n = tfidf_matrix.shape[0]
+    rows = np.arange(n) if rows is None else np.asarray(rows, dtype=np.int64)
+    k = max(0, min(k, n - 1))
+
+    nbr_idx = np.zeros((len(rows), k), dtype=np.int32)
+    nbr_scores = np.zeros((len(rows), k), dtype=np.float32)
+    if k == 0:
+        return nbr_idx, nbr_scores
+
+    matrix_t = tfidf_matrix.T.tocsc()
+
+    for start in range(0, len(rows), block_rows):
+        stop = min(start + block_rows, len(rows))
+        q = rows[start:stop]
+        block = (tfidf_matrix[q] @ matrix_t).toarray().astype(np.float32)
+
+        # never recommend a movie to itself
+        block[np.arange(len(q)), q] = -np.inf
+
+        nbr_idx[start:stop], nbr_scores[start:stop] = _topk_block(block, k)
+
+    return nbr_idx, nbr_scores
+
+
+ARTIFACTS_DIR = 'artifacts'
+ARTIFACTS_FORMAT_VERSION = 1
+
+
+def update_topk_neighbors(nbr_idx, nbr_scores, tfidf_matrix, rows, block_rows=TOPK_BLOCK_ROWS):
+    # Incremental refresh after `rows` changed or were appended: those rows are
+    # rescored in full; every other row merges its old list with its scores
+    # against the changed rows (old entries pointing at changed rows are dropped).
+    n = tfidf_matrix.shape[0]
+    k = nbr_idx.shape[1]
+    rows = np.asarray(rows, dtype=np.int64)
+
+    out_idx = np.zeros((n, k), dtype=np.int32)
+    out_scores = np.full((n, k), -np.inf, dtype=np.float32)
+    out_idx[:len(nbr_idx)] = nbr_idx
+    out_scores[:len(nbr_scores)] = nbr_scores
+
+    changed = np.zeros(n, dtype=bool)
+    changed[rows] = True
+
+    out_idx[rows], out_scores[rows] = build_topk_neighbors(tfidf_matrix, k, block_rows, rows=rows)
+
+    others = np.flatnonzero(~changed)
+    changed_t = tfidf_matrix[rows].T.tocsc()
+    for start in range(0, len(others), block_rows):
+        b = others[start:start + block_rows]
+        fresh = (tfidf_matrix[b] @ changed_t).toarray().astype(np.float32)
+
+        old_idx = out_idx[b]
+        old_scores = np.where(changed[old_idx], -np.inf, out_scores[b])
+
+        cand_idx = np.concatenate([old_idx, np.broadcast_to(rows, fresh.shape)], axis=1)
+        cand_scores = np.concatenate([old_scores, fresh], axis=1)
+
+        pos, best = _topk_block(cand_scores, k)
+        out_idx[b] = np.take_along_axis(cand_idx, pos, axis=1)
+        out_scores[b] = best
+
+    return out_idx, out_scores
+
+
+def _string_table(values):
+    encoded = [str(v).encode('utf-8') for v in values]
+    offsets = np.zeros(len(encoded) + 1, dtype=np.int64)
+    offsets[1:] = np.cumsum([len(b) for b in encoded])
+    blob = np.frombuffer(b''.join(encoded), dtype=np.uint8)
+    return offsets, blob
+
+
+# TMDB movie genre ids. The CSV stores genres as [{"id", "name"}] lists, but a
+# df.pkl from the notebook only has the names joined by spaces.
+TMDB_GENRES = {
+    'Action': 28, 'Adventure': 12, 'Animation': 16, 'Comedy': 35, 'Crime': 80,
+    'Documentary': 99, 'Drama': 18, 'Family': 10751, 'Fantasy': 14, 'Foreign': 10769,
+    'History': 36, 'Horror': 27, 'Music': 10402, 'Mystery': 9648, 'Romance': 10749,
+    'Science Fiction': 878, 'TV Movie': 10770, 'Thriller': 53, 'War': 10752, 'Western': 37,
+}
+
+
+def _genre_ids(value):
+    if not isinstance(value, str) or not value.strip():
+        return []
+    try:
+        parsed = ast.literal_eval(value)
+    except (ValueError, SyntaxError):
+        parsed = None
+    if isinstance(parsed, list):
+        return [int(g['id']) for g in parsed if isinstance(g, dict) and 'id' in g]
+
+    # space-joined names; two-word names ("Science Fiction", "TV Movie") first
+    words = value.split()
+    ids = []
+    i = 0
+    while i < len(words):
+        pair = " ".join(words[i:i + 2])
+        if pair in TMDB_GENRES:
+            ids.append(TMDB_GENRES[pair])
+            i += 2
+        else:
+            if words[i] in TMDB_GENRES:
+                ids.append(TMDB_GENRES[words[i]])
+            i += 1
+    return ids
+
+
+def catalog_columns(df):
+    # compact per-row catalog the API serves from instead of keeping df.pkl resident:
+    # genre ids as offsets + flat ids, ratings and popularity as float32
+    n = len(df)
+    ids = [_genre_ids(v) for v in df['genres']] if 'genres' in df.columns else [[]] * n
+
+    genre_offsets = np.zeros(n + 1, dtype=np.int64)
+    genre_offsets[1:] = np.cumsum([len(g) for g in ids])
+    genre_ids = np.fromiter((g for row in ids for g in row), dtype=np.int32, count=int(genre_offsets[-1]))
+
+    def numeric(col):
+        if col not in df.columns:
+            return np.zeros(n, dtype=np.float32)
+        return pd.to_numeric(df[col], errors='coerce').fillna(0).to_numpy(dtype=np.float32)
+
+    return {
+        'genre_offsets': genre_offsets,
+        'genre_ids': genre_ids,
+        'vote_average': numeric('vote_average'),
+        'popularity': numeric('popularity'),
+    }
+
+
+def popularity_rank(vote_average, popularity):
+    # row -> position when ordered by popularity then vote_average, both descending
+    order = np.lexsort((-np.asarray(vote_average), -np.asarray(popularity)))
+    rank = np.empty(len(order), dtype=np.int64)
+    rank[order] = np.arange(len(order))
+    return rank
+
+
+def build_genre_index(cols):
+    # genre id -> catalog rows, each posting list in popularity_rank order so the
+    # API reads its top-N off the front
+    genre_offsets, genre_ids = cols['genre_offsets'], cols['genre_ids']
+    n = len(genre_offsets) - 1
+
+    rank = popularity_rank(cols['vote_average'], cols['popularity'])
+
+    pair_rows = np.repeat(np.arange(n, dtype=np.int64), np.diff(genre_offsets))
+    by_genre = np.lexsort((rank[pair_rows], genre_ids))
+    ids, starts = np.unique(genre_ids[by_genre], return_index=True)
+
+    offsets = np.empty(len(ids) + 1, dtype=np.int64)
+    offsets[:-1] = starts
+    offsets[-1] = len(by_genre)
+    return {
+        'genre_index_ids': ids.astype(np.int32),
+        'genre_index_offsets': offsets,
+        'genre_index_rows': pair_rows[by_genre],
+    }
+
+
+def _json_safe_params(params):
+    out = {}
+    for k, v in params.items():
+        if isinstance(v, tuple):
+            v = list(v)
+        if v is None or isinstance(v, (str, int, float, bool, list)):
+            out[k] = v
+    return out
+
+
+# Approximate nearest neighbour (ANN) engine: TruncatedSVD projection to
+# dense float32 vectors + an IVF partition (k-means lists over those vectors).
+ANN_COMPONENTS = 128
+ANN_RECALL_SAMPLE = 200
+ANN_RECALL_K = 10
+ANN_NPROBE = 8
+
+
+def build_ann_index(tfidf_matrix, n_components=ANN_COMPONENTS, n_lists=None, seed=42):
+    from sklearn.cluster import MiniBatchKMeans
+    from sklearn.decomposition import TruncatedSVD
+
+    n, n_features = tfidf_matrix.shape
+    n_components = max(1, min(n_components, n_features - 1, n - 1))
+    n_lists = n_lists or max(1, int(np.sqrt(n)))
+
+    svd = TruncatedSVD(n_components=n_components, random_state=seed)
+    vectors = svd.fit_transform(tfidf_matrix).astype(np.float32)
+    vectors /= np.maximum(np.linalg.norm(vectors, axis=1, keepdims=True), 1e-12)
+
+    km = MiniBatchKMeans(n_clusters=n_lists, random_state=seed, n_init=3, batch_size=4096)
+    labels = km.fit_predict(vectors)
+
+    centroids = km.cluster_centers_.astype(np.float32)
+    centroids /= np.maximum(np.linalg.norm(centroids, axis=1, keepdims=True), 1e-12)
+
+    list_members = np.argsort(labels, kind='stable').astype(np.int32)
+    list_offsets = np.zeros(n_lists + 1, dtype=np.int64)
+    list_offsets[1:] = np.cumsum(np.bincount(labels, minlength=n_lists))
+
+    return {
+        'ann_vectors': vectors,
+        'ann_centroids': centroids,
+        'ann_list_offsets': list_offsets,
+        'ann_list_members': list_members,
+    }
+
+
+def _topk_order(scores, k):
+    # indices of the k largest scores, best first, without a full sort
+    k = min(k, scores.shape[0])
+    if k <= 0:
+        return np.empty(0, dtype=np.int64)
+    part = np.argpartition(-scores, k - 1)[:k]
+    return part[np.argsort(-scores[part], kind='stable')]
+
+
+def ann_search(ann, tfidf_matrix, idx, k, nprobe=ANN_NPROBE):
+    # probe the nprobe closest lists, then rerank candidates with exact TF-IDF scores;
+    # returns (rows, scores), best first. Shared by the build report and the API.
+    q = ann['ann_vectors'][idx]
+    probe = _topk_order(ann['ann_centroids'] @ q, nprobe)
+    offsets, members = ann['ann_list_offsets'], ann['ann_list_members']
+    cands = np.concatenate([members[offsets[l]:offsets[l + 1]] for l in probe])
+    cands = cands[cands != idx]
+    if cands.size == 0:
+        return cands, np.empty(0, dtype=np.float32)
+
+    scores = (tfidf_matrix[cands] @ tfidf_matrix[idx].T).toarray().ravel()
+    order = _topk_order(scores, k)
+    return cands[order], scores[order]
+
+
+def ann_recall(ann, tfidf_matrix, k=ANN_RECALL_K, sample=ANN_RECALL_SAMPLE, nprobe=ANN_NPROBE, seed=0):
+    # recall@k against exact scoring; rows appended after the ANN build are never queried
+    n = ann['ann_vectors'].shape[0]
+    rng = np.random.default_rng(seed)
+    queries = rng.choice(n, size=min(sample, n), replace=False)
+
+    hits = 0
+    total = 0
+    for idx in queries:
+        exact = (tfidf_matrix @ tfidf_matrix[idx].T).toarray().ravel()
+        exact[idx] = -np.inf
+        truth = set(_topk_order(exact, k).tolist())
+        found = set(ann_search(ann, tfidf_matrix, idx, k, nprobe)[0].tolist())
+        hits += len(truth & found)
+        total += len(truth)
+
+    return hits / total if total else 1.0
 
 
-def rebuild():
-    print("Loading MoviesData.csv...")
+# Versioned layout: every full build goes to artifacts/versions/<build_id>/ and
+# artifacts/CURRENT names the live one. The API swaps to a new version without a
+# restart, so older versions are kept around (KEEP_VERSIONS) for in-flight
+# requests and workers that have not reloaded yet.
+VERSIONS_DIR = os.path.join(ARTIFACTS_DIR, 'versions')
+CURRENT_POINTER = os.path.join(ARTIFACTS_DIR, 'CURRENT')
+KEEP_VERSIONS = 3
+
+
+def new_version():
+    build_id = uuid.uuid4().hex
+    out_dir = os.path.join(VERSIONS_DIR, build_id)
+    os.makedirs(out_dir, exist_ok=True)
+    return build_id, out_dir
+
+
+def current_artifacts_dir():
+    # live artifact directory: CURRENT pointer, else the legacy flat layout
+    if os.path.exists(CURRENT_POINTER):
+        with open(CURRENT_POINTER) as f:
+            return os.path.join(VERSIONS_DIR, f.read().strip())
+    if os.path.exists(os.path.join(ARTIFACTS_DIR, 'manifest.json')):
+        return ARTIFACTS_DIR
+    return None
+
+
+def publish_version(build_id, keep=KEEP_VERSIONS):
+    tmp = CURRENT_POINTER + '.tmp'
+    with open(tmp, 'w') as f:
+        f.write(build_id)
+    os.replace(tmp, CURRENT_POINTER)
+
+    versions = sorted(
+        (d for d in os.listdir(VERSIONS_DIR) if d != build_id),
+        key=lambda d: os.path.getmtime(os.path.join(VERSIONS_DIR, d)),
+        reverse=True,
+    )
+    for old in versions[keep - 1:]:
+        shutil.rmtree(os.path.join(VERSIONS_DIR, old), ignore_errors=True)
+
+    print(f"Published artifacts version {build_id}")
+
+
+def write_mmap_artifacts(out_dir, df, tfidf_matrix, tfidf, nbr_idx, nbr_scores,
+                         extra_arrays=None, extra_meta=None, build_id=None):
+    # Raw .npy arrays + manifest.json so the API can np.load(mmap_mode='r')
+    # them and every worker shares the same page cache.
+    os.makedirs(out_dir, exist_ok=True)
+
+    csr = tfidf_matrix.tocsr()
+    csr.sort_indices()
+
+    title_offsets, title_blob = _string_table(df['title'])
+    vocab = tfidf.get_feature_names_out()
+    vocab_offsets, vocab_blob = _string_table(vocab)
+
+    arrays = {
+        'tfidf_data': csr.data.astype(np.float32),
+        'tfidf_indices': csr.indices.astype(np.int32),
+        'tfidf_indptr': csr.indptr.astype(np.int64),
+        'title_offsets': title_offsets,
+        'title_blob': title_blob,
+        'vocab_offsets': vocab_offsets,
+        'vocab_blob': vocab_blob,
+        'idf': tfidf.idf_.astype(np.float64),
+    }
+    cols = catalog_columns(df)
+    arrays.update(cols)
+    arrays.update(build_genre_index(cols))
+    if nbr_idx is not None:
+        arrays['topk_indices'] = nbr_idx
+        arrays['topk_scores'] = nbr_scores
+    arrays.update(extra_arrays or {})
+
+    manifest = {
+        'format_version': ARTIFACTS_FORMAT_VERSION,
+        'build_id': build_id or uuid.uuid4().hex,
+        'n_rows': int(csr.shape[0]),
+        'n_features': int(csr.shape[1]),
+        'nnz': int(csr.nnz),
+        'vectorizer': _json_safe_params(tfidf.get_params()),
+    }
+    manifest.update(extra_meta or {})
+
+    _write_npy_dir(out_dir, arrays, manifest)
+
+
+def _write_npy_dir(out_dir, arrays, manifest):
+    files = {}
+    for name, arr in arrays.items():
+        fname = f'{name}.npy'
+        np.save(os.path.join(out_dir, fname), np.ascontiguousarray(arr))
+        files[name] = {'file': fname, 'dtype': str(arr.dtype), 'shape': list(arr.shape)}
+    _write_manifest(out_dir, dict(manifest, files=files))
+
+
+def _write_manifest(out_dir, manifest):
+    # manifest goes last so a half-written directory is never picked up
+    tmp = os.path.join(out_dir, 'manifest.json.tmp')
+    with open(tmp, 'w') as f:
+        json.dump(manifest, f, indent=2)
+    os.replace(tmp, os.path.join(out_dir, 'manifest.json'))
+
+
+# Text preprocessing (same steps as preprocessor_text in the notebook):
+# lowercase, strip non-letters, drop stopwords, WordNet-lemmatize. Runs over a
+# process pool in TEXT_PREP_CHUNK-row chunks; results keep input order.
+TEXT_PREP_CHUNK = 2000
+DEFAULT_WORKERS = os.cpu_count() or 1
+
+_STOP_WORDS = None
+_LEMMATIZER = None
+
+
+def _init_preprocessor():
+    global _STOP_WORDS, _LEMMATIZER
+    from nltk.corpus import stopwords
+    from nltk.stem import WordNetLemmatizer
+
+    _STOP_WORDS = set(stopwords.words('english'))
+    _LEMMATIZER = WordNetLemmatizer()
+    _LEMMATIZER.lemmatize('warmup')  # load WordNet once per process
+
+
+def check_nltk_data():
+    # fail once with a clear message, before any work and outside pool workers
+    try:
+        if _STOP_WORDS is None:
+            _init_preprocessor()
+    except (ImportError, LookupError):
+        sys.exit("Error: rebuilding needs the NLTK 'stopwords' and 'wordnet' data.\n"
+                 "Install them with: python -m nltk.downloader stopwords wordnet")
+
+
+def preprocessor_text(text):
+    # convert to string and lowercase
+    text = str(text).lower()
+
+    # remove punctuation and numbers
+    text = re.sub(r"[^a-zA-Z\s]", " ", text)
+
+    # tokenize, remove stopwords, lemmatize
+    words = [w for w in text.split() if w not in _STOP_WORDS]
+    words = [_LEMMATIZER.lemmatize(w) for w in words]
+
+    return " ".join(words)
+
+
+def _preprocess_chunk(texts):
+    return [preprocessor_text(t) for t in texts]
+
+
+def preprocess_texts(texts, workers=DEFAULT_WORKERS, chunk_size=TEXT_PREP_CHUNK, executor=None):
+    texts = list(texts)
+    chunks = [texts[i:i + chunk_size] for i in range(0, len(texts), chunk_size)]
+    out = []
+    own = False
+
+    # loaded here even when a pool does the work, so missing NLTK data raises
+    # one LookupError in this process instead of one per worker
+    if _STOP_WORDS is None:
+        _init_preprocessor()
+
+    if executor is None and workers <= 1:
+        results = map(_preprocess_chunk, chunks)
+    else:
+        own = executor is None
+        if own:
+            executor = ProcessPoolExecutor(max_workers=workers, initializer=_init_preprocessor)
+        # Executor.map yields in submission order, so output order is deterministic
+        results = executor.map(_preprocess_chunk, chunks)
+
+    start = time.time()
+    try:
+        for n, chunk_out in enumerate(results, 1):
+            out.extend(chunk_out)
+            if len(chunks) > 1:
+                elapsed = time.time() - start
+                print(f"  preprocessed {len(out)}/{len(texts)} rows "
+                      f"({len(out) / max(elapsed, 1e-9):.0f} rows/s)")
+    finally:
+        if own:
+            executor.shutdown()
+
+    return out
+
+
+def _genre_names(value):
+    # MoviesData.csv stores genres as a list of {"id", "name"} dicts
+    if not isinstance(value, str) or not value.strip():
+        return ''
+    try:
+        parsed = ast.literal_eval(value)
+    except (ValueError, SyntaxError):
+        return value
+    if isinstance(parsed, list):
+        return " ".join(str(g.get('name', '')) for g in parsed if isinstance(g, dict))
+    return value
+
+
+def build_tags(df):
+    # raw (unpreprocessed) tags: overview + tagline + genre names
+    parts = [df['overview'].fillna('')]
+    if 'tagline' in df.columns:
+        parts.append(df['tagline'].fillna(''))
+    if 'genres' in df.columns:
+        parts.append(df['genres'].map(_genre_names))
+
+    tags = parts[0].astype(str)
+    for p in parts[1:]:
+        tags = tags + " " + p.astype(str)
+    return tags
+
+
+def load_catalog(csv_path='MoviesData.csv'):
+    print(f"Loading {csv_path}...")
     # Load dataset
     try:
-        df = pd.read_csv('MoviesData.csv')
+        df = pd.read_csv(csv_path)
     except FileNotFoundError:
-        print("Error: MoviesData.csv not found!")
-        return
+        print(f"Error: {csv_path} not found!")
+        return None
 
     print(f"Loaded {len(df)} rows.")
 
@@ -20,21 +521,14 @@ def rebuild():
     df['title'] = df['title'].fillna('')
     df['overview'] = df['overview'].fillna('')
 
-    # Create TF-IDF Matrix
-    print("Generating TF-IDF Matrix...")
-    tfidf = TfidfVectorizer(stop_words='english')
-    tfidf_matrix = tfidf.fit_transform(df['overview'])
+    # Drop duplicates just in case, keeping the first occurrence, so row
+    # positions line up with the matrix
+    return df.drop_duplicates(subset='title', keep='first').reset_index(drop=True)
 
-    # Create Indices Map
-    # Drop duplicates just in case, keeping the first occurrence
-    df = df.drop_duplicates(
-        subset='title', keep='first').reset_index(drop=True)
-    # Re-calculate matrix after dropping duplicates to keep indices aligned
-    tfidf_matrix = tfidf.fit_transform(df['overview'])
 
+def save_pickles(df, tfidf, tfidf_matrix):
     indices = pd.Series(df.index, index=df['title']).drop_duplicates()
 
-    # Save files
     print("Saving pickles...")
 
     with open('df.pkl', 'wb') as f:
@@ -47,8 +541,777 @@ def rebuild():
         # Saving just the sparse matrix, not the vectorizer
         pickle.dump(tfidf_matrix, f)
 
+    # the vectorizer must match the matrix for free-text queries (/recommend/text)
+    with open('tfidf.pkl', 'wb') as f:
+        pickle.dump(tfidf, f)
+
+
+def write_full_artifacts(df, tfidf, tfidf_matrix, topk=TOPK_NEIGHBORS, ann=False,
+                         ann_components=ANN_COMPONENTS, ann_lists=None):
+    # the exact table is O(n^2) to build; very large catalogs can skip it (--topk 0)
+    nbr_idx = nbr_scores = None
+    if topk > 0:
+        print(f"Precomputing top-{topk} neighbours...")
+        nbr_idx, nbr_scores = build_topk_neighbors(tfidf_matrix, k=topk)
+        np.savez('tfidf_topk.npz', indices=nbr_idx, scores=nbr_scores)
+
+    ann_arrays, ann_meta = None, None
+    if ann:
+        print("Building ANN index (TruncatedSVD + IVF)...")
+        ann_arrays = build_ann_index(tfidf_matrix, n_components=ann_components, n_lists=ann_lists)
+        recall = ann_recall(ann_arrays, tfidf_matrix)
+        print(f"  ANN recall@{ANN_RECALL_K} vs exact (nprobe={ANN_NPROBE}): {recall:.3f}")
+        ann_meta = {
+            'ann': {
+                'components': int(ann_arrays['ann_vectors'].shape[1]),
+                'n_lists': int(ann_arrays['ann_centroids'].shape[0]),
+                'nprobe': ANN_NPROBE,
+                f'recall_at_{ANN_RECALL_K}': recall,
+            }
+        }
+
+    build_id, out_dir = new_version()
+    print(f"Writing memory-mappable artifacts to {out_dir}/...")
+    write_mmap_artifacts(out_dir, df, tfidf_matrix, tfidf, nbr_idx, nbr_scores,
+                         extra_arrays=ann_arrays, extra_meta=ann_meta, build_id=build_id)
+    publish_version(build_id)
+
+
+def rebuild(topk=TOPK_NEIGHBORS, ann=False, ann_components=ANN_COMPONENTS, ann_lists=None,
+            workers=DEFAULT_WORKERS):
+    df = load_catalog()
+    if df is None:
+        return
+
+    print(f"Preprocessing tags with {workers} worker(s)...")
+    df['tags'] = preprocess_texts(build_tags(df), workers=workers)
+
+    # Create TF-IDF Matrix (fitted once, after dedup)
+    print("Generating TF-IDF Matrix...")
+    tfidf = TfidfVectorizer(stop_words='english')
+    tfidf_matrix = tfidf.fit_transform(df['tags'])
+
+    save_pickles(df, tfidf, tfidf_matrix)
+    write_full_artifacts(df, tfidf, tfidf_matrix, topk=topk, ann=ann,
+                         ann_components=ann_components, ann_lists=ann_lists)
+    _write_state({'rows_since_fit': 0, 'rows_since_idf': 0, 'ann': bool(ann), 'topk': topk,
+                  'workers': workers})
+
     print("Success! All models rebuilt compatible with scikit-learn 1.8.0")
 
 
+# Incremental rebuilds: new/changed rows are transformed with the existing
+# vocabulary. IDF weights are refreshed once IDF_REFRESH_FRACTION of the catalog
+# changed since the last refresh; a full refit happens once REFIT_FRACTION of the
+# catalog changed since the last fit, or when the new text has more than
+# OOV_REFIT_THRESHOLD out-of-vocabulary terms.
+REBUILD_STATE = 'rebuild_state.json'
+IDF_REFRESH_FRACTION = 0.05
+REFIT_FRACTION = 0.25
+OOV_REFIT_THRESHOLD = 0.15
+
+
+def _read_state():
+    try:
+        with open(REBUILD_STATE) as f:
+            return json.load(f)
+    except FileNotFoundError:
+        return {'rows_since_fit': 0, 'rows_since_idf': 0}
+
+
+def _write_state(state):
+    with open(REBUILD_STATE, 'w') as f:
+        json.dump(state, f, indent=2)
+
+
+def _oov_rate(tfidf, texts):
+    analyzer = tfidf.build_analyzer()
+    vocab = tfidf.vocabulary_
+    total = oov = 0
+    for text in texts:
+        for term in analyzer(text):
+            total += 1
+            oov += term not in vocab
+    return oov / total if total else 0.0
+
+
+def _replace_rows(tfidf_matrix, rows, new_rows, n_total):
+    # rows < n_base are overwritten in place, rows >= n_base are appended
+    n_base = tfidf_matrix.shape[0]
+    stacked = sparse.vstack([tfidf_matrix, new_rows]).tocsr()
+    perm = np.arange(n_total)
+    perm[rows] = n_base + np.arange(len(rows))
+    return stacked[perm]
+
+
+def refresh_idf(tfidf, tfidf_matrix):
+    # recompute IDF from current document frequencies and reweight rows in place
+    n = tfidf_matrix.shape[0]
+    smooth = int(tfidf.smooth_idf)
+    doc_freq = np.bincount(tfidf_matrix.indices, minlength=tfidf_matrix.shape[1])
+    new_idf = np.log((n + smooth) / (doc_freq + smooth)) + 1.0
+
+    reweighted = sparse.csr_matrix(tfidf_matrix.multiply(new_idf / tfidf.idf_))
+    if tfidf.norm:
+        reweighted = normalize(reweighted, norm=tfidf.norm)
+
+    tfidf.idf_ = new_idf
+    return reweighted
+
+
+def write_delta_artifacts(out_dir, base_manifest, rows, df, tfidf_matrix, nbr_idx, nbr_scores):
+    # rows that differ from the mmap base (cumulative across incremental runs)
+    os.makedirs(out_dir, exist_ok=True)
+
+    delta = tfidf_matrix[rows].tocsr()
+    delta.sort_indices()
+    title_offsets, title_blob = _string_table(df['title'].iloc[rows])
+
+    arrays = {
+        'delta_rows': np.asarray(rows, dtype=np.int64),
+        'delta_data': delta.data.astype(np.float32),
+        'delta_indices': delta.indices.astype(np.int32),
+        'delta_indptr': delta.indptr.astype(np.int64),
+        'delta_title_offsets': title_offsets,
+        'delta_title_blob': title_blob,
+    }
+    # catalog columns and the genre index are small, so the delta carries them whole
+    cols = catalog_columns(df)
+    arrays.update(cols)
+    arrays.update(build_genre_index(cols))
+    if nbr_idx is not None:
+        arrays['topk_indices'] = nbr_idx
+        arrays['topk_scores'] = nbr_scores
+
+    _write_npy_dir(out_dir, arrays, {
+        'format_version': ARTIFACTS_FORMAT_VERSION,
+        'base_build_id': base_manifest['build_id'],
+        'n_rows': int(tfidf_matrix.shape[0]),
+        'n_features': int(tfidf_matrix.shape[1]),
+    })
+
+
+def rebuild_incremental(csv_path='MoviesData.csv', workers=DEFAULT_WORKERS):
+    # a streaming build hashes features and leaves the pickles of an older build
+    # behind; a delta computed from those would not line up with the live matrix
+    base_dir = current_artifacts_dir()
+    if base_dir is not None:
+        with open(os.path.join(base_dir, 'manifest.json')) as f:
+            kind = json.load(f).get('vectorizer', {}).get('kind')
+        if kind == 'hashing':
+            print("Live build is a streaming (hashed) build, running a streaming rebuild.")
+            rebuild_streaming(csv_path, workers=workers)
+            return
+
+    try:
+        with open('df.pkl', 'rb') as f:
+            df = pickle.load(f)
+        with open('tfidf.pkl', 'rb') as f:
+            tfidf = pickle.load(f)
+        with open('tfidf_matrix.pkl', 'rb') as f:
+            tfidf_matrix = sparse.csr_matrix(pickle.load(f))
+    except FileNotFoundError:
+        print("No previous build found, running a full rebuild.")
+        rebuild(workers=workers)
+        return
+
+    state = _read_state()
+    topk = state.get('topk', TOPK_NEIGHBORS)
+
+    new_df = load_catalog(csv_path)
+    if new_df is None:
+        return
+
+    n_base = len(df)
+    base_pos = {t: i for i, t in enumerate(df['title'])}
+    base_tags = dict(zip(df['title'], build_tags(df)))
+
+    known = new_df['title'].isin(base_pos)
+    raw_tags = build_tags(new_df)
+    changed_mask = known & (raw_tags != new_df['title'].map(base_tags))
+    changed = new_df[changed_mask]
+    appended = new_df[~known]
+
+    rows = [base_pos[t] for t in changed['title']] + list(range(n_base, n_base + len(appended)))
+    if not rows:
+        print("Catalog unchanged, nothing to do.")
+        return
+
+    texts = preprocess_texts(
+        list(raw_tags[changed_mask]) + list(raw_tags[~known]), workers=workers,
+    )
+    n_total = n_base + len(appended)
+    oov = _oov_rate(tfidf, texts)
+    rows_since_fit = state.get('rows_since_fit', 0) + len(rows)
+
+    print(f"{len(changed)} changed, {len(appended)} new rows (OOV rate {oov:.1%}).")
+    if oov > OOV_REFIT_THRESHOLD or rows_since_fit / n_total > REFIT_FRACTION:
+        print("Drift threshold exceeded, running a full refit.")
+        rebuild(topk=topk, ann=state.get('ann', False), workers=workers)
+        return
+
+    changed = changed.assign(tags=texts[:len(changed)])
+    appended = appended.assign(tags=texts[len(changed):])
+
+    # rows no longer in the CSV are kept; removals need a full rebuild
+    shared = [c for c in df.columns if c in changed.columns]
+    df.loc[[base_pos[t] for t in changed['title']], shared] = changed[shared].values
+    df = pd.concat([df, appended], ignore_index=True)
+
+    tfidf_matrix = _replace_rows(tfidf_matrix, rows, tfidf.transform(texts), n_total)
+
+    rows_since_idf = state.get('rows_since_idf', 0) + len(rows)
+    idf_refreshed = rows_since_idf / n_total > IDF_REFRESH_FRACTION
+    if idf_refreshed:
+        print("Refreshing IDF weights...")
+        tfidf_matrix = refresh_idf(tfidf, tfidf_matrix)
+        rows_since_idf = 0
+
+    save_pickles(df, tfidf, tfidf_matrix)
+
+    new_state = dict(state, rows_since_fit=rows_since_fit, rows_since_idf=rows_since_idf)
+
+    if idf_refreshed:
+        # every row was reweighted, so a delta would be the whole matrix
+        write_full_artifacts(df, tfidf, tfidf_matrix, topk=topk, ann=state.get('ann', False))
+        _write_state(new_state)
+        print("Success! IDF refreshed, full artifacts rewritten.")
+        return
+
+    nbr_idx = nbr_scores = None
+    if topk > 0 and os.path.exists('tfidf_topk.npz'):
+        print("Updating top-K neighbours...")
+        with np.load('tfidf_topk.npz') as t:
+            nbr_idx, nbr_scores = update_topk_neighbors(t['indices'], t['scores'], tfidf_matrix, rows)
+        np.savez('tfidf_topk.npz', indices=nbr_idx, scores=nbr_scores)
+
+    base_dir = current_artifacts_dir()
+    if base_dir is not None:
+        with open(os.path.join(base_dir, 'manifest.json')) as f:
+            base_manifest = json.load(f)
+
+        # keep rows from earlier deltas against the same base
+        delta_dir = os.path.join(base_dir, 'delta')
+        delta_rows = set(rows)
+        prev = os.path.join(delta_dir, 'manifest.json')
+        if os.path.exists(prev):
+            with open(prev) as f:
+                prev_manifest = json.load(f)
+            if prev_manifest.get('base_build_id') == base_manifest.get('build_id'):
+                delta_rows.update(np.load(os.path.join(delta_dir, 'delta_rows.npy')).tolist())
+
+        print(f"Writing delta artifacts to {delta_dir}/...")
+        write_delta_artifacts(delta_dir, base_manifest, sorted(delta_rows), df,
+                              tfidf_matrix, nbr_idx, nbr_scores)
+
+    _write_state(new_state)
+    print(f"Success! Applied {len(rows)} row updates incrementally.")
+
+
+# Streaming ingestion: the CSV is read in chunks and hashed with a stateless
+# HashingVectorizer, so no vocabulary or full matrix is ever held in memory.
+# Pass 1 writes raw term-count CSR shards to disk and accumulates document
+# frequencies; pass 2 applies IDF + L2 norm shard by shard into memory-mapped
+# output arrays. Chunk size adapts to keep the working set under STREAM_MEMORY_MB.
+STREAM_CHUNK_ROWS = 20000
+STREAM_MEMORY_MB = 512
+STREAM_N_FEATURES = 2 ** 20
+
+
+def _title_hashes(titles):
+    # 64-bit title digests for duplicate detection across chunks
+    return np.fromiter(
+        (int.from_bytes(hashlib.blake2b(str(t).encode('utf-8'), digest_size=8).digest(), 'little')
+         for t in titles),
+        dtype=np.uint64, count=len(titles),
+    )
+
+
+def _seen_contains(runs, hashes):
+    found = np.zeros(len(hashes), dtype=bool)
+    for run in runs:
+        pos = np.minimum(np.searchsorted(run, hashes), len(run) - 1)
+        found |= run[pos] == hashes
+    return found
+
+
+def _seen_add(runs, hashes):
+    # sorted runs merged while the newer one is at least half the older, so there
+    # are O(log n) runs and each digest is copied O(log n) times
+    runs.append(np.sort(hashes))
+    while len(runs) > 1 and len(runs[-2]) <= 2 * len(runs[-1]):
+        newer = runs.pop()
+        runs[-1] = np.union1d(runs[-1], newer)
+
+
+# (genre id, -popularity, -vote_average, row): sorting these records gives the
+# genre index postings in build_genre_index order without ranking all rows at once
+GENRE_PAIR_DTYPE = np.dtype([('g', '<i4'), ('p', '<f4'), ('v', '<f4'), ('r', '<i8')])
+
+
+def _sort_genre_pairs(recs):
+    return recs[np.lexsort((recs['r'], recs['v'], recs['p'], recs['g']))]
+
+
+def _genre_pairs_le(recs, last):
+    # recs <= last in (g, p, v, r) order; on a sorted block this is a prefix
+    g, p, v, r = last['g'], last['p'], last['v'], last['r']
+    return (recs['g'] < g) | ((recs['g'] == g) & (
+        (recs['p'] < p) | ((recs['p'] == p) & (
+            (recs['v'] < v) | ((recs['v'] == v) & (recs['r'] <= r))))))
+
+
+def _merge_genre_runs(a_path, b_path, out_path, block):
+    # two sorted run files -> one, holding at most two blocks in memory
+    a = np.memmap(a_path, dtype=GENRE_PAIR_DTYPE, mode='r')
+    b = np.memmap(b_path, dtype=GENRE_PAIR_DTYPE, mode='r')
+    i = j = 0
+    with open(out_path, 'wb') as out:
+        while i < len(a) and j < len(b):
+            x = np.array(a[i:i + block])
+            y = np.array(b[j:j + block])
+            # everything up to the smaller of the two block ends is final
+            last = x[-1] if _genre_pairs_le(x[-1:], y[-1])[0] else y[-1]
+            nx = int(_genre_pairs_le(x, last).sum())
+            ny = int(_genre_pairs_le(y, last).sum())
+            out.write(_sort_genre_pairs(np.concatenate([x[:nx], y[:ny]])).tobytes())
+            i += nx
+            j += ny
+        for src, k in ((a, i), (b, j)):
+            for start in range(k, len(src), block):
+                out.write(np.array(src[start:start + block]).tobytes())
+    del a, b
+    os.remove(a_path)
+    os.remove(b_path)
+
+
+def _bin_to_npy(bin_path, npy_path, dtype, block_bytes=16 * 2 ** 20):
+    # raw column file written chunk by chunk -> .npy, copied in fixed-size blocks
+    dtype = np.dtype(dtype)
+    count = os.path.getsize(bin_path) // dtype.itemsize
+    if count == 0:
+        np.save(npy_path, np.zeros(0, dtype=dtype))
+        return 0
+    out = np.lib.format.open_memmap(npy_path, mode='w+', dtype=dtype, shape=(count,))
+    block_bytes -= block_bytes % dtype.itemsize
+    with open(bin_path, 'rb') as f:
+        pos = 0
+        while True:
+            buf = f.read(block_bytes)
+            if not buf:
+                break
+            part = np.frombuffer(buf, dtype=dtype)
+            out[pos:pos + len(part)] = part
+            pos += len(part)
+    out.flush()
+    del out
+    return count
+
+
+def rebuild_streaming(csv_path='MoviesData.csv',
+                      chunk_rows=STREAM_CHUNK_ROWS, memory_mb=STREAM_MEMORY_MB,
+                      n_features=STREAM_N_FEATURES, workers=DEFAULT_WORKERS):
+    from sklearn.feature_extraction.text import HashingVectorizer
+
+    hasher = HashingVectorizer(
+        n_features=n_features, stop_words='english', alternate_sign=False, norm=None,
+    )
+
+    budget = memory_mb * 2 ** 20
+
+    try:
+        reader = pd.read_csv(
+            csv_path,
+            usecols=lambda c: c in {'title', 'overview', 'tagline', 'genres',
+                                    'vote_average', 'popularity'},
+            iterator=True,
+        )
+    except FileNotFoundError:
+        print(f"Error: {csv_path} not found!")
+        return
+
+    build_id, out_dir = new_version()
+    shard_dir = os.path.join(out_dir, 'shards')
+    os.makedirs(shard_dir, exist_ok=True)
+
+    doc_freq = np.zeros(n_features, dtype=np.int64)
+    # titles already ingested, as sorted uint64 digest runs (8 bytes per title)
+    seen = []
+    # per-row catalog columns go straight to raw files in shard_dir, like the
+    # titles; genre (row, rank key) pairs become one sorted run file per chunk
+    columns = {
+        'title_blob': np.uint8,
+        'title_offsets': np.int64,
+        'genre_offsets': np.int64,
+        'genre_ids': np.int32,
+        'vote_average': np.float32,
+        'popularity': np.float32,
+    }
+    col_files = {name: open(os.path.join(shard_dir, f'{name}.bin'), 'wb') for name in columns}
+    col_files['title_offsets'].write(np.zeros(1, dtype=np.int64).tobytes())
+    col_files['genre_offsets'].write(np.zeros(1, dtype=np.int64).tobytes())
+    title_end = genre_end = 0
+    genre_counts = {}
+    genre_runs = []
+    shards = []
+    n_rows = nnz = 0
+
+    executor = None
+    if workers > 1:
+        executor = ProcessPoolExecutor(max_workers=workers, initializer=_init_preprocessor)
+
+    print(f"Pass 1: hashing {csv_path} in chunks of ~{chunk_rows} rows...")
+    try:
+        while True:
+            try:
+                chunk = reader.get_chunk(chunk_rows)
+            except StopIteration:
+                break
+
+            chunk['title'] = chunk['title'].fillna('')
+            chunk['overview'] = chunk['overview'].fillna('')
+            chunk = chunk.drop_duplicates(subset='title', keep='first')
+            hashes = _title_hashes(chunk['title'])
+            new = ~_seen_contains(seen, hashes)
+            chunk = chunk[new]
+            if chunk.empty:
+                continue
+            _seen_add(seen, hashes[new])
+
+            tags = preprocess_texts(build_tags(chunk), workers=workers, executor=executor)
+            counts = hasher.transform(tags).tocsr()
+            doc_freq += np.bincount(counts.indices, minlength=n_features)
+
+            shard_path = os.path.join(shard_dir, f'shard_{len(shards):05d}.npz')
+            sparse.save_npz(shard_path, counts)
+            shards.append(shard_path)
+
+            encoded = [str(t).encode('utf-8') for t in chunk['title']]
+            col_files['title_blob'].write(b''.join(encoded))
+            ends = title_end + np.cumsum([len(b) for b in encoded], dtype=np.int64)
+            col_files['title_offsets'].write(ends.tobytes())
+            title_end = int(ends[-1])
+
+            cols = catalog_columns(chunk)
+            col_files['genre_offsets'].write((cols['genre_offsets'][1:] + genre_end).tobytes())
+            genre_end += len(cols['genre_ids'])
+            for name in ('genre_ids', 'vote_average', 'popularity'):
+                col_files[name].write(cols[name].tobytes())
+
+            local = np.repeat(np.arange(len(chunk)), np.diff(cols['genre_offsets']))
+            if len(local):
+                pairs = np.empty(len(local), dtype=GENRE_PAIR_DTYPE)
+                pairs['g'] = cols['genre_ids']
+                pairs['p'] = -cols['popularity'][local]
+                pairs['v'] = -cols['vote_average'][local]
+                pairs['r'] = n_rows + local
+                run_path = os.path.join(shard_dir, f'genres_{len(genre_runs):05d}.bin')
+                with open(run_path, 'wb') as f:
+                    f.write(_sort_genre_pairs(pairs).tobytes())
+                genre_runs.append(run_path)
+                for g, c in zip(*np.unique(cols['genre_ids'], return_counts=True)):
+                    genre_counts[int(g)] = genre_counts.get(int(g), 0) + int(c)
+
+            n_rows += counts.shape[0]
+            nnz += counts.nnz
+
+            # ~3x the chunk's footprint is live at once (frame, counts, weighted copy)
+            used = 3 * (counts.data.nbytes + counts.indices.nbytes
+                        + int(chunk.memory_usage(deep=True).sum()))
+            # the digest runs are the only in-memory state that grows with the input
+            available = budget - sum(run.nbytes for run in seen)
+            chunk_rows = int(max(1000, min(chunk_rows * 2, chunk_rows * available / max(used, 1))))
+            print(f"  {n_rows} rows, {nnz} non-zeros")
+    finally:
+        for f in col_files.values():
+            f.close()
+        if executor is not None:
+            executor.shutdown()
+
+    if n_rows == 0:
+        print("Error: no rows ingested.")
+        shutil.rmtree(out_dir, ignore_errors=True)
+        return
+
+    print("Pass 2: applying IDF and writing memory-mapped CSR arrays...")
+    idf = np.log((n_rows + 1) / (doc_freq + 1)) + 1.0
+
+    data = np.lib.format.open_memmap(os.path.join(out_dir, 'tfidf_data.npy'), mode='w+', dtype=np.float32, shape=(nnz,))
+    indices = np.lib.format.open_memmap(os.path.join(out_dir, 'tfidf_indices.npy'), mode='w+', dtype=np.int32, shape=(nnz,))
+    indptr = np.lib.format.open_memmap(os.path.join(out_dir, 'tfidf_indptr.npy'), mode='w+', dtype=np.int64, shape=(n_rows + 1,))
+
+    row = pos = 0
+    indptr[0] = 0
+    for shard_path in shards:
+        shard = normalize(sparse.csr_matrix(sparse.load_npz(shard_path).multiply(idf)), norm='l2')
+        shard.sort_indices()
+        m, k = shard.shape[0], shard.nnz
+        data[pos:pos + k] = shard.data
+        indices[pos:pos + k] = shard.indices
+        indptr[row + 1:row + m + 1] = pos + shard.indptr[1:]
+        row += m
+        pos += k
+        os.remove(shard_path)
+
+    data.flush()
+    indices.flush()
+    indptr.flush()
+    del data, indices, indptr
+
+    for name, dtype in columns.items():
+        _bin_to_npy(os.path.join(shard_dir, f'{name}.bin'),
+                    os.path.join(out_dir, f'{name}.npy'), dtype)
+
+    # genre index: pairwise on-disk merges of the sorted runs, two blocks at a time
+    print(f"Merging {len(genre_runs)} genre runs...")
+    block = max(1024, budget // (6 * GENRE_PAIR_DTYPE.itemsize))
+    merges = 0
+    while len(genre_runs) > 1:
+        merged = []
+        for a, b in zip(genre_runs[0::2], genre_runs[1::2]):
+            out_path = os.path.join(shard_dir, f'merged_{merges:05d}.bin')
+            merges += 1
+            _merge_genre_runs(a, b, out_path, block)
+            merged.append(out_path)
+        if len(genre_runs) % 2:
+            merged.append(genre_runs[-1])
+        genre_runs = merged
+
+    rows_path = os.path.join(out_dir, 'genre_index_rows.npy')
+    n_genres = genre_end
+    if genre_runs:
+        pairs = np.memmap(genre_runs[0], dtype=GENRE_PAIR_DTYPE, mode='r')
+        out = np.lib.format.open_memmap(rows_path, mode='w+', dtype=np.int64, shape=(n_genres,))
+        for start in range(0, n_genres, block):
+            out[start:start + block] = pairs['r'][start:start + block]
+        out.flush()
+        del out, pairs
+    else:
+        np.save(rows_path, np.zeros(0, dtype=np.int64))
+
+    genre_index_ids = np.array(sorted(genre_counts), dtype=np.int32)
+    genre_index_offsets = np.zeros(len(genre_index_ids) + 1, dtype=np.int64)
+    genre_index_offsets[1:] = np.cumsum([genre_counts[g] for g in genre_index_ids.tolist()])
+    np.save(os.path.join(out_dir, 'genre_index_ids.npy'), genre_index_ids)
+    np.save(os.path.join(out_dir, 'genre_index_offsets.npy'), genre_index_offsets)
+    n_postings = len(genre_index_ids)
+    shutil.rmtree(shard_dir)
+
+    # hashed features have no vocabulary; the API rebuilds the hasher from these params
+    empty_offsets, empty_blob = _string_table([])
+    np.save(os.path.join(out_dir, 'vocab_offsets.npy'), empty_offsets)
+    np.save(os.path.join(out_dir, 'vocab_blob.npy'), empty_blob)
+    np.save(os.path.join(out_dir, 'idf.npy'), idf)
+
+    files = {}
+    for name, dtype, shape in [
+        ('tfidf_data', 'float32', [nnz]),
+        ('tfidf_indices', 'int32', [nnz]),
+        ('tfidf_indptr', 'int64', [n_rows + 1]),
+        ('title_offsets', 'int64', [n_rows + 1]),
+        ('title_blob', 'uint8', [title_end]),
+        ('vocab_offsets', 'int64', [1]),
+        ('vocab_blob', 'uint8', [0]),
+        ('idf', 'float64', [n_features]),
+        ('genre_offsets', 'int64', [n_rows + 1]),
+        ('genre_ids', 'int32', [n_genres]),
+        ('vote_average', 'float32', [n_rows]),
+        ('popularity', 'float32', [n_rows]),
+        ('genre_index_ids', 'int32', [n_postings]),
+        ('genre_index_offsets', 'int64', [n_postings + 1]),
+        ('genre_index_rows', 'int64', [n_genres]),
+    ]:
+        files[name] = {'file': f'{name}.npy', 'dtype': dtype, 'shape': shape}
+
+    _write_manifest(out_dir, {
+        'format_version': ARTIFACTS_FORMAT_VERSION,
+        'build_id': build_id,
+        'n_rows': n_rows,
+        'n_features': n_features,
+        'nnz': nnz,
+        'files': files,
+        'vectorizer': {
+            'kind': 'hashing',
+            'n_features': n_features,
+            'stop_words': 'english',
+            'alternate_sign': False,
+            'norm': 'l2',
+        },
+    })
+
+    publish_version(build_id)
+    print(f"Success! Streamed {n_rows} rows into {out_dir}/")
+
+
+TMDB_BASE = "https://api.themoviedb.org/3"
+TMDB_MAP_DB = 'tmdb_map.sqlite'
+TMDB_MAP_CONCURRENCY = 8
+
+
+def _open_tmdb_map(db_path):
+    conn = sqlite3.connect(db_path)
+    conn.execute(
+        """
+        CREATE TABLE IF NOT EXISTS tmdb_map (
+            row_idx INTEGER PRIMARY KEY,
+            title TEXT NOT NULL,
+            tmdb_id INTEGER,
+            poster_path TEXT,
+            release_date TEXT,
+            vote_average REAL,
+            fetched_at REAL NOT NULL
+        )
+        """
+    )
+    return conn
+
+
+async def _search_tmdb_titles(titles, api_key, concurrency):
+    import httpx
+
+    sem = asyncio.Semaphore(concurrency)
+
+    async with httpx.AsyncClient(base_url=TMDB_BASE, timeout=20.0) as client:
+
+        async def one(row_idx, title):
+            async with sem:
+                try:
+                    r = await client.get(
+                        "/search/movie",
+                        params={
+                            "api_key": api_key,
+                            "query": title,
+                            "page": 1,
+                            "language": "en-US",
+                            "include_adult": "false",
+                        },
+                    )
+                    r.raise_for_status()
+                except httpx.HTTPError as e:
+                    print(f"  skipped '{title}': {type(e).__name__}")
+                    return None
+
+                results = r.json().get("results", [])
+                m = results[0] if results else {}
+                return (
+                    row_idx,
+                    title,
+                    m.get("id"),
+                    m.get("poster_path"),
+                    m.get("release_date"),
+                    m.get("vote_average"),
+                    time.time(),
+                )
+
+        return await asyncio.gather(*(one(i, t) for i, t in titles))
+
+
+def build_tmdb_map(db_path=TMDB_MAP_DB, refresh=False, concurrency=TMDB_MAP_CONCURRENCY):
+    from dotenv import load_dotenv
+
+    load_dotenv()
+    api_key = os.getenv("TMDB_API_KEY")
+    if not api_key:
+        print("Error: TMDB_API_KEY is missing in the .env file")
+        return
+
+    try:
+        with open('df.pkl', 'rb') as f:
+            df = pickle.load(f)
+    except FileNotFoundError:
+        print("Error: df.pkl not found! Run rebuild first.")
+        return
+
+    conn = _open_tmdb_map(db_path)
+
+    # rows already mapped to the same title are kept unless --refresh is given
+    done = {}
+    if not refresh:
+        done = dict(conn.execute("SELECT row_idx, title FROM tmdb_map"))
+
+    titles = [
+        (i, str(t)) for i, t in enumerate(df['title'])
+        if done.get(i) != str(t)
+    ]
+    print(f"Looking up {len(titles)} of {len(df)} titles on TMDB...")
+
+    batch = 500
+    for start in range(0, len(titles), batch):
+        rows = asyncio.run(
+            _search_tmdb_titles(titles[start:start + batch], api_key, concurrency)
+        )
+        conn.executemany(
+            "INSERT OR REPLACE INTO tmdb_map VALUES (?, ?, ?, ?, ?, ?, ?)",
+            [r for r in rows if r is not None],
+        )
+        conn.commit()
+        print(f"  {min(start + batch, len(titles))}/{len(titles)}")
+
+    # drop rows that no longer exist after a catalog shrink
+    conn.execute("DELETE FROM tmdb_map WHERE row_idx >= ?", (len(df),))
+    conn.commit()
+    conn.close()
+
+    print(f"Success! TMDB mapping written to {db_path}")
+
+
 if __name__ == "__main__":
-    rebuild()
+    parser = argparse.ArgumentParser(description="Rebuild recommendation artifacts")
+    parser.add_argument(
+        "--tmdb-map", action="store_true",
+        help="fill the local title -> TMDB id mapping from df.pkl instead of rebuilding",
+    )
+    parser.add_argument(
+        "--refresh", action="store_true",
+        help="with --tmdb-map, look up every title again",
+    )
+    parser.add_argument(
+        "--incremental", action="store_true",
+        help="apply new/changed rows from MoviesData.csv to the previous build",
+    )
+    parser.add_argument(
+        "--streaming", action="store_true",
+        help="bounded-memory chunked ingestion straight to artifacts/ (hashed features)",
+    )
+    parser.add_argument("--chunk-rows", type=int, default=STREAM_CHUNK_ROWS)
+    parser.add_argument(
+        "--memory-mb", type=int, default=STREAM_MEMORY_MB,
+        help="with --streaming, target peak working set per chunk",
+    )
+    parser.add_argument(
+        "--workers", type=int, default=DEFAULT_WORKERS,
+        help="processes for text preprocessing (default: all cores)",
+    )
+    parser.add_argument(
+        "--topk", type=int, default=TOPK_NEIGHBORS,
+        help="neighbours per movie in the precomputed table (0 skips it)",
+    )
+    parser.add_argument(
+        "--ann", action="store_true",
+        help="also build the approximate nearest neighbour index",
+    )
+    parser.add_argument("--ann-components", type=int, default=ANN_COMPONENTS)
+    parser.add_argument(
+        "--ann-lists", type=int, default=None,
+        help="IVF partitions (default: sqrt of the catalog size)",
+    )
+    args = parser.parse_args()
+
+    if not args.tmdb_map:
+        check_nltk_data()
+
+    if args.tmdb_map:
+        build_tmdb_map(refresh=args.refresh)
+    elif args.incremental:
+        rebuild_incremental(workers=args.workers)
+    elif args.streaming:
+        rebuild_streaming(chunk_rows=args.chunk_rows, memory_mb=args.memory_mb,
+                          workers=args.workers)
+    else:
+        rebuild(
+            topk=args.topk,
+            ann=args.ann,
+            ann_components=args.ann_components,
+            ann_lists=args.ann_lists,
+            workers=args.workers,
+        )
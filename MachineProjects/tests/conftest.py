@@ -0,0 +1,6 @@
+import os
+import sys
+
+# main.py refuses to import without a key; the tests never reach TMDB
+os.environ.setdefault("TMDB_API_KEY", "test")
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
@@ -0,0 +1,34 @@
+from fastapi.testclient import TestClient
+
+import main
+
+
+def test_json_response_keeps_cors_vary(monkeypatch):
+    monkeypatch.setattr(main, "RESPONSE_COMPRESS_MIN_BYTES", 1)
+    client = TestClient(main.app)
+
+    r = client.get(
+        "/health",
+        # a cookie makes CORS echo the origin, which always adds Vary: Origin
+        headers={
+            "Origin": "https://example.com",
+            "Cookie": "session=1",
+            "Accept-Encoding": "gzip",
+        },
+    )
+
+    assert r.status_code == 200
+    assert r.headers["content-encoding"] == "gzip"
+    vary = {t.strip().lower() for t in r.headers["vary"].split(",")}
+    assert {"origin", "accept-encoding"} <= vary
+
+
+def test_if_none_match_returns_304():
+    client = TestClient(main.app)
+
+    etag = client.get("/health").headers["etag"]
+    r = client.get("/health", headers={"If-None-Match": etag})
+
+    assert r.status_code == 304
+    assert r.content == b""
+